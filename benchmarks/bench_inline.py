@@ -0,0 +1,34 @@
+'''
+Compare the single-pass inline tokenizer against the original five-stage
+split pipeline on long, link-dense paragraphs.
+
+    python3 benchmarks/bench_inline.py
+'''
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from corpus import link_dense_paragraph
+from textnode import text_to_textnodes_pipeline, tokenize_inline
+
+
+def best_of(func, text, repeat=5):
+    number = 1
+    while timeit.timeit(lambda: func(text), number=number) < 0.2:
+        number *= 2
+    return min(timeit.repeat(lambda: func(text), number=number, repeat=repeat)) / number
+
+def main():
+    print(f"{'spans':>8} {'chars':>10} {'pipeline ms':>12} {'tokenizer ms':>13} {'speedup':>8}")
+    for spans in (10, 100, 1000, 10000):
+        text = link_dense_paragraph(spans)
+        if tokenize_inline(text) != text_to_textnodes_pipeline(text):
+            raise SystemExit(f"engines disagree at {spans} spans")
+        pipeline = best_of(text_to_textnodes_pipeline, text)
+        tokenizer = best_of(tokenize_inline, text)
+        print(f"{spans:>8} {len(text):>10} {pipeline * 1000:>12.3f} {tokenizer * 1000:>13.3f} {pipeline / tokenizer:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
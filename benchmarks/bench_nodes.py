@@ -0,0 +1,77 @@
+'''
+Memory and throughput of building and serializing node trees for the
+content/ corpus, scaled up synthetically.
+
+    python3 benchmarks/bench_nodes.py [--src DIR] [--scale N]
+
+--src points at another checkout's src/ directory, so the node classes of
+two revisions can be compared on the same corpus.
+'''
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def load_corpus(scale):
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "content", "**", "*.md"), recursive=True)):
+        with open(path) as f:
+            bodies.append(f.read())
+    # Repeat every page's body so each synthetic page is scale times longer
+    return ["\n\n".join([body] * scale) for body in bodies]
+
+def count_nodes(node):
+    return 1 + sum(count_nodes(child) for child in node.children or [])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--src", default=os.path.join(ROOT, "src"))
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.src))
+    from textnode import markdown_to_html_node, text_to_textnodes
+
+    pages = load_corpus(args.scale)
+    megabytes = sum(len(page) for page in pages) / 1e6
+
+    tracemalloc.start()
+    trees = [markdown_to_html_node(page) for page in pages]
+    tree_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = sum(count_nodes(tree) for tree in trees)
+
+    paragraphs = [block for page in pages for block in page.split("\n\n") if block[:1].isalpha()]
+    tracemalloc.start()
+    spans = [text_to_textnodes(paragraph) for paragraph in paragraphs]
+    span_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    span_count = sum(len(nodes) for nodes in spans)
+    del trees, spans
+
+    parse = []
+    serialize = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        trees = [markdown_to_html_node(page) for page in pages]
+        middle = time.perf_counter()
+        for tree in trees:
+            tree.to_html()
+        parse.append(middle - start)
+        serialize.append(time.perf_counter() - middle)
+        del trees
+
+    print(f"corpus:      {len(pages)} pages, {megabytes:.2f} MB")
+    print(f"HTMLNode:    {nodes} nodes, {tree_bytes / nodes:.0f} bytes/node")
+    print(f"TextNode:    {span_count} nodes, {span_bytes / span_count:.0f} bytes/node")
+    print(f"parse:       {min(parse) * 1000:.1f} ms, {megabytes / min(parse):.1f} MB/s")
+    print(f"to_html:     {min(serialize) * 1000:.1f} ms, {megabytes / min(serialize):.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+'''
+Synthetic markdown corpora for the benchmarks. Everything is generated from
+a seeded random.Random, so the same arguments always give the same corpus.
+'''
+import os
+import random
+
+WORDS = (
+    "elves hobbits ring mountain river forest shadow valley tower road "
+    "journey council wizard dwarves gold song light ancient king return"
+).split()
+
+SHAPES = ("mixed", "link-heavy", "list-heavy", "code-heavy")
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def link_dense_paragraph(spans):
+    # Emphasis only at the edges, so the pipeline's link and image stages
+    # see one long text node, as they would for a link list or footer
+    parts = ["A **long** paragraph of "]
+    for i in range(spans):
+        parts.append(f"see [link {i}](/blog/post-{i}) and ![image {i}](/images/{i}.png) ")
+    parts.append("ending in `code`.")
+    return "".join(parts)
+
+def paragraph(rng):
+    parts = []
+    for _ in range(rng.randint(3, 6)):
+        parts.append(words(rng, rng.randint(4, 10)))
+        kind = rng.random()
+        if kind < 0.2:
+            parts.append(f"**{words(rng, 2)}**")
+        elif kind < 0.35:
+            parts.append(f"_{words(rng, 2)}_")
+        elif kind < 0.5:
+            parts.append(f"`{rng.choice(WORDS)}()`")
+    return " ".join(parts) + "."
+
+def link_paragraph(rng):
+    links = []
+    for i in range(rng.randint(10, 30)):
+        if rng.random() < 0.2:
+            links.append(f"![{words(rng, 2)}](/images/{rng.choice(WORDS)}-{i}.png)")
+        else:
+            links.append(f"[{words(rng, 2)}](/blog/{rng.choice(WORDS)}-{i})")
+    return words(rng, 3) + " " + ", ".join(links) + "."
+
+def list_block(rng, ordered):
+    items = []
+    for i in range(rng.randint(5, 20)):
+        marker = f"{i + 1}." if ordered else "-"
+        items.append(f"{marker} {words(rng, rng.randint(3, 8))}")
+    return "\n".join(items)
+
+def code_block(rng):
+    lines = []
+    for i in range(rng.randint(5, 30)):
+        indent = "    " * rng.randint(0, 3)
+        lines.append(f"{indent}{rng.choice(WORDS)}_{i} = {rng.choice(WORDS)}({i})")
+        if rng.random() < 0.1:
+            lines.append("")
+    return "```\n" + "\n".join(lines) + "\n```"
+
+def quote_block(rng):
+    return "\n".join(f"> {words(rng, rng.randint(4, 10))}" for _ in range(rng.randint(1, 4)))
+
+BLOCK_WEIGHTS = {
+    "mixed": [(paragraph, 5), (link_paragraph, 1), (list_block, 2), (code_block, 1), (quote_block, 1)],
+    "link-heavy": [(link_paragraph, 6), (paragraph, 1), (list_block, 1)],
+    "list-heavy": [(list_block, 6), (paragraph, 1)],
+    "code-heavy": [(code_block, 5), (paragraph, 2)],
+}
+
+def make_page(rng, shape="mixed", blocks=40):
+    funcs, weights = zip(*BLOCK_WEIGHTS[shape])
+    parts = [f"# {words(rng, 4).title()}"]
+    for _ in range(blocks):
+        func = rng.choices(funcs, weights)[0]
+        if func is list_block:
+            parts.append(func(rng, ordered=rng.random() < 0.5))
+        else:
+            parts.append(func(rng))
+        if rng.random() < 0.1:
+            parts.append(f"## {words(rng, 3).title()}")
+    return "\n\n".join(parts) + "\n"
+
+def make_pages(shape="mixed", pages=100, blocks=40, seed=0):
+    rng = random.Random(f"{shape}-{seed}")
+    return [make_page(rng, shape, blocks) for _ in range(pages)]
+
+def write_corpus(root, shape="mixed", pages=100, blocks=40, depth=1, seed=0):
+    '''
+    Write pages as index.md files under root, nested depth directories deep,
+    with fanout chosen so the pages spread over the whole tree. Returns the
+    total number of markdown bytes written.
+    '''
+    fanout = max(2, round(pages ** (1 / max(depth, 1))))
+    total = 0
+    for i, markdown in enumerate(make_pages(shape, pages, blocks, seed)):
+        parts = []
+        n = i
+        for _ in range(depth):
+            parts.append(f"d{n % fanout}")
+            n //= fanout
+        page_dir = os.path.join(root, *parts, f"page{i}")
+        os.makedirs(page_dir, exist_ok=True)
+        with open(os.path.join(page_dir, "index.md"), "w") as f:
+            f.write(markdown)
+        total += len(markdown.encode())
+    return total
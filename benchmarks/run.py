@@ -0,0 +1,164 @@
+'''
+Benchmark suite for the markdown-to-HTML pipeline.
+
+    python3 benchmarks/run.py                   # run and compare to baseline
+    python3 benchmarks/run.py --save-baseline   # record a new baseline
+
+Each case runs in a fresh process so its peak RSS is its own. Throughput
+(MB/s) falling, or peak RSS growing, by more than --tolerance relative to
+benchmarks/baseline.json fails the run with a non-zero exit status.
+'''
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+import corpus
+from scheduler import build_pages
+from textnode import collect_pages, markdown_to_html_node, text_to_textnodes
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+TEMPLATE = '<html><head><title>{{ Title }}</title><link href="/index.css" /></head><body>{{ Content }}</body></html>'
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def bench_inline(config):
+    pages = corpus.make_pages("link-heavy", config["pages"], config["blocks"])
+    paragraphs = [block for page in pages for block in page.split("\n\n") if block[:1].isalpha()]
+    size = sum(len(p.encode()) for p in paragraphs)
+    seconds = best_time(lambda: [text_to_textnodes(p) for p in paragraphs], config["repeat"])
+    return len(pages), size, seconds
+
+def bench_parse(shape):
+    def bench(config):
+        pages = corpus.make_pages(shape, config["pages"], config["blocks"])
+        size = sum(len(p.encode()) for p in pages)
+        seconds = best_time(lambda: [markdown_to_html_node(p) for p in pages], config["repeat"])
+        return len(pages), size, seconds
+    return bench
+
+def bench_serialize(config):
+    pages = corpus.make_pages("mixed", config["pages"], config["blocks"])
+    trees = [markdown_to_html_node(p) for p in pages]
+    size = sum(len(tree.to_html().encode()) for tree in trees)
+    seconds = best_time(lambda: [tree.to_html() for tree in trees], config["repeat"])
+    return len(pages), size, seconds
+
+def bench_build(config):
+    with tempfile.TemporaryDirectory() as tmp:
+        content_dir = os.path.join(tmp, "content")
+        public_dir = os.path.join(tmp, "public")
+        template_path = os.path.join(tmp, "template.html")
+        with open(template_path, "w") as f:
+            f.write(TEMPLATE)
+        size = corpus.write_corpus(content_dir, "mixed", config["pages"], config["blocks"], config["depth"])
+
+        def build():
+            shutil.rmtree(public_dir, ignore_errors=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_pages(collect_pages(content_dir, public_dir), template_path, "/site/")
+
+        seconds = best_time(build, config["repeat"])
+        return config["pages"], size, seconds
+
+CASES = {
+    "inline/link-heavy": bench_inline,
+    "parse/mixed": bench_parse("mixed"),
+    "parse/link-heavy": bench_parse("link-heavy"),
+    "parse/list-heavy": bench_parse("list-heavy"),
+    "parse/code-heavy": bench_parse("code-heavy"),
+    "serialize/mixed": bench_serialize,
+    "build/deep-tree": bench_build,
+}
+
+def run_case(name, config):
+    pages, size, seconds = CASES[name](config)
+    # ru_maxrss is in kilobytes on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        "seconds": seconds,
+        "pages_per_second": pages / seconds,
+        "mb_per_second": size / 1e6 / seconds,
+        "peak_rss_mb": peak_rss,
+    }
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result["mb_per_second"] < before["mb_per_second"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['mb_per_second']:.2f} MB/s, baseline {before['mb_per_second']:.2f} MB/s")
+        if result["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {result['peak_rss_mb']:.1f} MB, baseline {before['peak_rss_mb']:.1f} MB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the markdown-to-HTML pipeline")
+    parser.add_argument("--pages", type=int, default=200, help="pages per corpus (default: 200)")
+    parser.add_argument("--blocks", type=int, default=40, help="blocks per page (default: 40)")
+    parser.add_argument("--depth", type=int, default=4, help="directory depth of the build corpus (default: 4)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, best is kept (default: 3)")
+    parser.add_argument("--cases", nargs="*", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="allowed relative slowdown or RSS growth (default: 0.3)")
+    args = parser.parse_args()
+
+    config = {"pages": args.pages, "blocks": args.blocks, "depth": args.depth, "repeat": args.repeat}
+    results = {}
+    print(f"{'case':<20} {'pages/s':>10} {'MB/s':>8} {'peak RSS MB':>12}")
+    # spawn, so every case starts from a clean interpreter
+    context = multiprocessing.get_context("spawn")
+    for name in args.cases:
+        with context.Pool(1) as pool:
+            result = pool.apply(run_case, (name, config))
+        results[name] = result
+        print(f"{name:<20} {result['pages_per_second']:>10.1f} {result['mb_per_second']:>8.2f} {result['peak_rss_mb']:>12.1f}")
+
+    # The corpus shape decides what is comparable, the repeat count does not
+    corpus_config = {key: config[key] for key in ("pages", "blocks", "depth")}
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"config": corpus_config, "results": results}, f, indent=1, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against, run with --save-baseline first")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["config"] != corpus_config:
+        print(f"Baseline was recorded with {baseline['config']}, not comparing")
+        return
+
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(f"\nREGRESSION against {args.baseline}:", file=sys.stderr)
+        for regression in regressions:
+            print(f"\t{regression}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.tolerance:.0%} of the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import asyncio
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import profiling
+import scheduler
+import site_index
+import textnode
+from scheduler import PageBuildError
+
+
+def read_source(from_path):
+    with open(from_path, "rb") as from_file:
+        return from_file.read()
+
+def content_task(from_path, data):
+    '''
+    Parse and serialize one page on the CPU executor, returning its title,
+    content HTML and site index entry. Like scheduler.render_task, errors
+    and worker reports are returned rather than raised so nothing is lost
+    when it runs in another process, and a page whose front matter the
+    index cannot use fails here rather than in the writer. The page's
+    profile row covers this step only; reads and writes overlap with other
+    pages and are left out.
+    '''
+    document = error = None
+    try:
+        with profiling.page(from_path):
+            title, content, text, metadata = textnode.content_from_bytes(data)
+            document = title, content, site_index.page_entry(from_path, title, text, metadata)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return document, error, scheduler.worker_reports()
+
+def write_batch(batch, fsync):
+    '''
+    Write (from_path, dest_path, page, entry) items, recording the site
+    index entry of each written page. Returns the (from_path, message) of
+    any that failed.
+    '''
+    failures = []
+    for from_path, dest_path, page, entry in batch:
+        try:
+            textnode.write_page(dest_path, page, fsync)
+            site_index.record(dest_path, entry)
+        except Exception as e:
+            failures.append((from_path, f"{type(e).__name__}: {e}"))
+    return failures
+
+def cpu_executor(jobs):
+    if jobs == 1:
+        # A thread still keeps the event loop free to schedule I/O
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=scheduler.init_worker,
+        initargs=(scheduler.worker_settings(),),
+    )
+
+async def build_pages_async(pages, template_path, basepath, jobs=1, concurrency=32, batch_size=16, fsync=False):
+    '''
+    pages - A list of (from_path, dest_path) tuples, e.g. from collect_pages
+    jobs - Processes parsing markdown, as for build_pages
+    concurrency - Pages read ahead or in flight at once, which also sizes
+    the I/O thread pool
+    batch_size - Most pages handed to one write call
+    fsync - fsync every written page before reporting it done
+
+    Sources are prefetched on I/O threads while earlier pages are parsed, and
+    finished pages are written in batches by a single writer, so waiting on
+    slow (e.g. network) storage overlaps with rendering. Failures are
+    collected and raised as PageBuildError at the end, as in build_pages.
+    '''
+    loop = asyncio.get_running_loop()
+    template = textnode.page_template(template_path, basepath)
+    jobs = scheduler.resolve_jobs(jobs)
+    semaphore = asyncio.Semaphore(concurrency)
+    # Bounded so rendering cannot run arbitrarily far ahead of the writer
+    queue = asyncio.Queue(maxsize=batch_size * 2)
+    failures = []
+
+    with ThreadPoolExecutor(max_workers=concurrency) as io_pool, cpu_executor(jobs) as cpu_pool:
+        async def render(from_path, dest_path):
+            async with semaphore:
+                try:
+                    data = await loop.run_in_executor(io_pool, read_source, from_path)
+                except OSError as e:
+                    failures.append((from_path, f"{type(e).__name__}: {e}"))
+                    return
+                document, error, reports = await loop.run_in_executor(cpu_pool, content_task, from_path, data)
+                scheduler.merge_worker_reports(reports)
+                if error is not None:
+                    failures.append((from_path, error))
+                    return
+                title, content, entry = document
+                page = textnode.render_page_html(template, title, content)
+            await queue.put((from_path, dest_path, page, entry))
+
+        async def writer():
+            done = False
+            while not done:
+                item = await queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                while len(batch) < batch_size and not queue.empty():
+                    item = queue.get_nowait()
+                    if item is None:
+                        done = True
+                        break
+                    batch.append(item)
+
+                failed = await loop.run_in_executor(io_pool, write_batch, batch, fsync)
+                failures.extend(failed)
+                failed_paths = set(from_path for from_path, _ in failed)
+                for from_path, dest_path, *_ in batch:
+                    if from_path not in failed_paths:
+                        print(f"\t* {from_path} {template_path} -> {dest_path}")
+
+        writer_task = asyncio.create_task(writer())
+        renderers = asyncio.gather(*(render(from_path, dest_path) for from_path, dest_path in pages))
+        await asyncio.wait((writer_task, renderers), return_when=asyncio.FIRST_COMPLETED)
+        if writer_task.done():
+            # The writer only stops early on an error, and with nothing
+            # taking from the queue the renderers would wait on it forever
+            renderers.cancel()
+            await asyncio.gather(renderers, return_exceptions=True)
+            writer_task.result()
+        await renderers
+        await queue.put(None)
+        await writer_task
+
+    if failures:
+        for from_path, error in failures:
+            print(f"\t! {from_path}: {error}", file=sys.stderr)
+        raise PageBuildError(failures)
+    return len(pages)
+
+def build_pages_with_asyncio(pages, template_path, basepath, jobs=1, **options):
+    '''
+    Drop-in replacement for scheduler.build_pages running build_pages_async
+    '''
+    return asyncio.run(build_pages_async(pages, template_path, basepath, jobs, **options))
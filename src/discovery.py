@@ -0,0 +1,129 @@
+import fnmatch
+import os
+import re
+
+# Editor, OS and VCS litter that never belongs in the site. Dotfiles in
+# general are kept, since e.g. static/.nojekyll or .well-known/ are real.
+IGNORE_PATTERNS = (".git", ".hg", ".svn", ".DS_Store", "Thumbs.db", "*~", "*.swp", ".#*", "#*#")
+
+# Only these files under content/ are rendered; anything else there is ignored
+PAGE_SUFFIXES = (".md", ".markdown")
+
+
+def compile_ignore(patterns):
+    '''
+    Fold glob patterns into one regex. A pattern matches a file or directory
+    by name ("*.swp") or by its path relative to the walked root
+    ("drafts/*"), always written with forward slashes.
+    '''
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+def is_ignored(matcher, rel_path):
+    if matcher is None:
+        return False
+    rel_path = rel_path.replace(os.sep, "/")
+    return bool(matcher.match(rel_path.rsplit("/", 1)[-1]) or matcher.match(rel_path))
+
+def accepts(matcher, rel_path, suffixes=None):
+    '''
+    Whether scan would list rel_path, checking each of its parent
+    directories against the ignore patterns too
+    '''
+    parts = rel_path.split(os.sep)
+    for depth in range(1, len(parts) + 1):
+        if is_ignored(matcher, os.sep.join(parts[:depth])):
+            return False
+    return has_suffix(rel_path, suffixes)
+
+def has_suffix(rel_path, suffixes):
+    return suffixes is None or os.path.splitext(rel_path)[1].lower() in suffixes
+
+def scan(root, ignore=IGNORE_PATTERNS, suffixes=None):
+    '''
+    Return the paths of every file below root, relative to it, in
+    directory order (a directory's files and subdirectories sorted by name).
+
+    The tree is walked once with os.scandir, so file types come from the
+    directory listing instead of a stat per entry. Ignored directories are
+    not descended into.
+
+    ignore - Glob patterns, see compile_ignore
+    suffixes - If given, only files with one of these (lower case) extensions
+    '''
+    matcher = compile_ignore(ignore)
+    files = []
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+
+        subdirs = []
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name)
+            if is_ignored(matcher, rel_path):
+                continue
+            if entry.is_dir():
+                subdirs.append(rel_path)
+            elif entry.is_file() and has_suffix(entry.name, suffixes):
+                files.append(rel_path)
+        stack.extend(reversed(subdirs))
+    return sorted(files, key=lambda rel_path: rel_path.split(os.sep))
+
+def relative_path(path, root):
+    '''
+    os.path.relpath(path, root) for a path made by joining onto root, as
+    scanned and output paths are, without the two abspath calls per path.
+    Any other path goes through relpath.
+    '''
+    prefix = os.path.join(root, "")
+    if path.startswith(prefix):
+        return path[len(prefix):]
+    return os.path.relpath(path, root)
+
+def page_dest_path(path):
+    return os.path.splitext(path)[0] + ".html"
+
+def collect_pages(dir_path_content, dest_dir_path, ignore=IGNORE_PATTERNS, page_suffixes=PAGE_SUFFIXES):
+    '''
+    Return a sorted list of (from_path, dest_path) pairs, one per markdown
+    file under dir_path_content, without rendering anything
+    '''
+    return [
+        (os.path.join(dir_path_content, rel_path), page_dest_path(os.path.join(dest_dir_path, rel_path)))
+        for rel_path in scan(dir_path_content, ignore, page_suffixes)
+    ]
+
+
+class SiteManifest():
+    def __init__(self, pages, assets):
+        '''
+        pages - Sorted (from_path, dest_path) pairs, one per markdown file
+        assets - Sorted static file paths, relative to the static directory
+        '''
+        self.pages = pages
+        self.assets = assets
+
+    def outputs(self, dest_dir_path):
+        '''
+        Every file a build of this manifest produces, relative to
+        dest_dir_path
+        '''
+        outputs = set(self.assets)
+        outputs.update(os.path.relpath(dest_path, dest_dir_path) for _, dest_path in self.pages)
+        return outputs
+
+    def __repr__(self):
+        return f"SiteManifest({len(self.pages)} pages, {len(self.assets)} assets)"
+
+
+def discover(content_dir, static_dir, dest_dir_path, ignore=IGNORE_PATTERNS, page_suffixes=PAGE_SUFFIXES):
+    '''
+    Enumerate the pages under content_dir and the assets under static_dir
+    in one pass each
+    '''
+    pages = collect_pages(content_dir, dest_dir_path, ignore, page_suffixes)
+    assets = scan(static_dir, ignore) if os.path.isdir(static_dir) else []
+    return SiteManifest(pages, assets)
@@ -0,0 +1,111 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import static_sync
+from manifest import hash_bytes, hash_file
+from textnode import write_page
+
+# Written to the public directory, mapping each asset to its fingerprinted copy
+ASSET_MANIFEST_PATH = "asset-manifest.json"
+HASH_LENGTH = 10
+
+# Assets pages link to by URL. Anything else (robots.txt, favicon.ico,
+# .nojekyll, ...) is fetched by a fixed name and keeps only that one.
+FINGERPRINT_SUFFIXES = (
+    ".css", ".js", ".mjs", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg",
+    ".woff", ".woff2", ".ttf", ".otf", ".mp3", ".mp4", ".webm", ".pdf",
+)
+
+
+def fingerprinted_name(rel_path, digest):
+    '''
+    "images/tom.png" -> "images/tom.<hash>.png"
+    '''
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+def url_path(rel_path):
+    return rel_path.replace(os.sep, "/")
+
+
+class AssetManifest():
+    __slots__ = ("names", "digest")
+
+    def __init__(self, names):
+        '''
+        names - Maps each asset's URL path below the site root to its
+        fingerprinted one, e.g. {"index.css": "index.0123456789.css"}
+
+        digest identifies the mapping, so templates compiled against it can
+        be cached and pages rendered with it tracked by incremental builds.
+        '''
+        self.names = names
+        self.digest = hash_bytes(json.dumps(names, sort_keys=True).encode("utf-8"))[:HASH_LENGTH]
+
+    def outputs(self):
+        '''
+        The fingerprinted files, relative to the public directory
+        '''
+        return {os.path.join(*name.split("/")) for name in self.names.values()}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self.names)} assets, {self.digest})"
+
+
+def load_asset_manifest(public_dir):
+    try:
+        with open(os.path.join(public_dir, ASSET_MANIFEST_PATH), "r") as f:
+            names = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return AssetManifest(names) if isinstance(names, dict) else None
+
+def remove_fingerprints(public_dir):
+    '''
+    Delete the copies and manifest a previous fingerprint_static left in
+    public_dir, for a build that no longer fingerprints
+    '''
+    previous = load_asset_manifest(public_dir)
+    if previous is not None:
+        static_sync.remove_orphans(sorted(previous.outputs()) + [ASSET_MANIFEST_PATH], public_dir)
+
+def fingerprint_static(static_dir, public_dir, files, link=False, jobs=None):
+    '''
+    Hash each asset once and put a copy of it at its fingerprinted name in
+    public_dir, next to the plain copy static_sync keeps there for CSS
+    url()s and links from outside the site. A fingerprinted name already
+    present holds the same bytes, since the name is derived from them, so
+    only new ones are copied. Copies the previous asset manifest listed
+    and this one does not are removed.
+
+    files - Static files relative to static_dir, as listed by discovery
+    link - Hardlink instead of copying where possible
+
+    Writes ASSET_MANIFEST_PATH and returns the AssetManifest.
+    '''
+    assets = [rel_path for rel_path in files if rel_path.lower().endswith(FINGERPRINT_SUFFIXES)]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        digests = pool.map(lambda rel_path: hash_file(os.path.join(static_dir, rel_path)), assets)
+        names = {
+            url_path(rel_path): url_path(fingerprinted_name(rel_path, digest))
+            for rel_path, digest in zip(assets, digests)
+        }
+    manifest = AssetManifest(names)
+
+    copied = 0
+    for rel_path in assets:
+        to_path = os.path.join(public_dir, *names[url_path(rel_path)].split("/"))
+        if not os.path.exists(to_path):
+            static_sync.copy_file(os.path.join(static_dir, rel_path), to_path, link)
+            copied += 1
+
+    previous = load_asset_manifest(public_dir)
+    removed = []
+    if previous is not None:
+        removed = sorted(previous.outputs() - manifest.outputs())
+        static_sync.remove_orphans(removed, public_dir)
+
+    write_page(os.path.join(public_dir, ASSET_MANIFEST_PATH), json.dumps(names, indent=2, sort_keys=True) + "\n")
+    print(f"Fingerprint: {len(assets)} asset(s), copied {copied}, removed {len(removed)}")
+    return manifest
@@ -0,0 +1,38 @@
+'''
+Shared scaffolding for the tests that build into a scratch directory
+'''
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    '''
+    A TestCase with a fresh temporary directory per test, removed after
+    tearDown. Subclasses that override setUp call super().setUp() first.
+    '''
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, *parts):
+        return os.path.join(self.tmp.name, *parts)
+
+    def write(self, path, data):
+        '''
+        Write text, or bytes, to path, creating its directories. A relative
+        path is taken below the temporary directory. Returns the full path.
+        '''
+        path = self.path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(data, bytes):
+            with open(path, "wb") as f:
+                f.write(data)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+        return path
+
+    def read(self, *parts):
+        with open(self.path(*parts), encoding="utf-8") as f:
+            return f.read()
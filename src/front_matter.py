@@ -0,0 +1,120 @@
+'''
+Key/value front matter at the top of a markdown file:
+
+    ---
+    title: Why Tom Bombadil Was a Mistake
+    date: 2024-03-01
+    tags: tolkien, characters
+    ---
+    # Why Tom Bombadil Was a Mistake
+
+Keys are case-insensitive, values are plain strings (see as_list for
+comma-separated ones), blank lines and lines starting with # are skipped.
+There is no YAML: no nesting, no multi-line values, no types.
+'''
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+DELIMITER = "---"
+
+# scan_metadata stops looking for a title after this much of a file
+MAX_HEADER_CHARS = 64 * 1024
+
+
+class FrontMatterError(ValueError):
+    pass
+
+
+def split_front_matter(lines):
+    '''
+    lines - Any iterable of lines, such as an open file or
+    textnode.iter_lines(text)
+
+    Return (metadata, body), where body iterates the lines after the front
+    matter. Without front matter metadata is empty and body yields every
+    line. Only the front matter itself is read.
+    '''
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if first.lstrip("\ufeff").rstrip("\r\n") != DELIMITER:
+        return {}, itertools.chain((first,), lines)
+
+    metadata = {}
+    for number, line in enumerate(lines, 2):
+        line = line.strip()
+        if line == DELIMITER:
+            return metadata, lines
+        if line == "" or line.startswith("#"):
+            continue
+        key, separator, value = line.partition(":")
+        key = key.strip().lower()
+        if not separator or not key:
+            raise FrontMatterError(f"Invalid front matter on line {number}, expected 'key: value': {line}")
+        metadata[key] = unquote(value.strip())
+    raise FrontMatterError(f"Front matter is missing its closing {DELIMITER}")
+
+def unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+def as_list(value):
+    '''
+    "tolkien, characters" -> ["tolkien", "characters"]
+    '''
+    if not value:
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def parse_date(value):
+    '''
+    Seconds since the epoch for an ISO 8601 date or date and time, taken
+    as UTC unless it names a timezone
+    '''
+    try:
+        date = datetime.fromisoformat(value)
+    except ValueError:
+        raise FrontMatterError(f"Invalid date in front matter: {value}") from None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.timestamp()
+
+
+def scan_metadata(from_path, max_chars=MAX_HEADER_CHARS):
+    '''
+    The front matter of a markdown file plus its "title": the front
+    matter's own, or else the first heading. Reading stops at that heading,
+    so listing pages, tags or a sitemap never has to parse a page body.
+    The title is None if there is no heading in the first max_chars.
+    '''
+    with open(from_path, "r", encoding="utf-8") as from_file:
+        metadata, body = split_front_matter(from_file)
+        if metadata.get("title"):
+            return metadata
+        metadata["title"] = None
+        read = 0
+        for line in body:
+            if line.startswith("#"):
+                metadata["title"] = line[2:].rstrip("\r\n")
+                break
+            read += len(line)
+            if read >= max_chars:
+                break
+    return metadata
+
+def scan_pages(pages, jobs=None):
+    '''
+    scan_metadata for many files at once, on a thread pool since the work
+    is nearly all waiting on reads
+
+    pages - Markdown paths, or (from_path, dest_path) pairs as returned by
+    discovery.collect_pages
+
+    Returns {from_path: metadata}, in input order.
+    '''
+    paths = [page[0] if isinstance(page, tuple) else page for page in pages]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return dict(zip(paths, pool.map(scan_metadata, paths)))
@@ -1,5 +1,41 @@
 
+import re
+
+# Elements whose text_content() ends with a line break, so words from
+# neighbouring blocks do not run together
+BLOCK_TAGS = frozenset(("div", "p", "blockquote", "pre", "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6"))
+
+# Elements without a closing tag in HTML, which minified output leaves off
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"))
+
+# Whitespace inside these is content, so minified output keeps it exactly
+PRESERVE_TAGS = frozenset(("pre", "code", "textarea", "script", "style"))
+
+# HTML's whitespace characters; a no-break space is content, not whitespace
+WHITESPACE_PATTERN = re.compile(r"[ \t\n\r\f]+")
+
+
+class Minifier():
+    __slots__ = ("saved",)
+
+    def __init__(self):
+        '''
+        Passed down through to_html(minifier) to have the serializer emit
+        compact HTML: runs of whitespace in text collapse to one space and
+        void elements lose their closing tag. saved counts the bytes this
+        left out.
+        '''
+        self.saved = 0
+
+    def text(self, value):
+        compact = WHITESPACE_PATTERN.sub(" ", value)
+        self.saved += len(value) - len(compact)
+        return compact
+
+
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         '''
         tag - A string representing the HTML tag name (e.g. "p", "a", "h1", etc)
@@ -19,9 +55,47 @@ class HTMLNode():
         self.children = children
         self.props = props
 
-    def to_html(self):
+    def to_html(self, minifier=None):
+        '''
+        minifier - A Minifier to serialize compactly, None for the HTML as is
+        '''
         raise NotImplementedError("to_html not implemented")
 
+    def iter_html(self, minifier=None):
+        '''
+        Yield the HTML for this node in chunks, in document order. Joining
+        the chunks gives the same string as to_html().
+        '''
+        raise NotImplementedError("iter_html not implemented")
+
+    def write_html(self, fp, minifier=None):
+        '''
+        Stream the HTML for this node into a text file object without
+        building the whole document in memory
+        '''
+        fp.writelines(self.iter_html(minifier))
+
+    def _append_html(self, parts, minifier=None):
+        # Appends the same chunks iter_html yields to a list, so to_html can
+        # finish with a single join and no per-level string copies
+        parts.extend(self.iter_html(minifier))
+
+    def text_content(self):
+        '''
+        The text of this node and everything below it, without markup
+        '''
+        parts = []
+        self._append_text(parts)
+        return "".join(parts).strip()
+
+    def _append_text(self, parts):
+        if self.value is not None:
+            parts.append(str(self.value))
+        for child in self.children or ():
+            child._append_text(parts)
+        if self.tag in BLOCK_TAGS:
+            parts.append("\n")
+
     def props_to_html(self):
         if self.props is None:
             return ""
@@ -38,22 +112,41 @@ class HTMLNode():
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, value=None, children=children, props=props)
 
-    def to_html(self):
+    def to_html(self, minifier=None):
+        parts = []
+        self._append_html(parts, minifier)
+        return "".join(parts)
+
+    def iter_html(self, minifier=None):
+        self._validate()
+        if self.tag in PRESERVE_TAGS:
+            minifier = None
+        yield f"<{self.tag}{self.props_to_html()}>"
+        for child in self.children:
+            yield from child.iter_html(minifier)
+        yield f"</{self.tag}>"
+
+    def _append_html(self, parts, minifier=None):
+        self._validate()
+        if self.tag in PRESERVE_TAGS:
+            minifier = None
+        parts.append(f"<{self.tag}{self.props_to_html()}>")
+        for child in self.children:
+            child._append_html(parts, minifier)
+        parts.append(f"</{self.tag}>")
+
+    def _validate(self):
         if self.tag is None:
             raise ValueError("Invalid tag value provided")
         
         if self.children is None:
             raise ValueError("Invalid children value provided")
 
-        children = ""
-        for child in self.children:
-            children += child.to_html()
-
-        return f"<{self.tag}{self.props_to_html()}>{children}</{self.tag}>"
-
     def __repr__(self):
         return f"{self.__class__.__name__}({self.tag}, children: {self.children}, {self.props})"
 
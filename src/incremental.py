@@ -0,0 +1,105 @@
+import os
+
+import site_index
+import textnode
+from manifest import hash_file, load_manifest, save_manifest
+from scheduler import PageBuildError, build_pages
+from textnode import collect_pages
+
+
+def page_entry(from_path, template_hash, basepath):
+    entry = {
+        "source": from_path,
+        "source_hash": hash_file(from_path),
+        "template_hash": template_hash,
+        "basepath": basepath,
+        # A new parser version, inline engine or minify setting renders the
+        # same markdown differently
+        "parser": textnode.parser_version(),
+    }
+    # Only recorded when on, so entries from before fingerprinting existed
+    # still match
+    if textnode.asset_manifest is not None:
+        entry["assets"] = textnode.asset_manifest.digest
+    return entry
+
+def prune_outputs(old_pages, new_pages, dest_dir_path):
+    '''
+    Delete outputs recorded in the previous manifest whose sources no longer
+    exist, then remove any directories left empty below dest_dir_path.
+    Files the manifest never knew about are left alone.
+    '''
+    pruned = []
+    root = os.path.abspath(dest_dir_path)
+    for dest_path in sorted(old_pages):
+        if dest_path in new_pages:
+            continue
+        if os.path.isfile(dest_path):
+            print(f"\t- {dest_path}")
+            os.remove(dest_path)
+        pruned.append(dest_path)
+
+        parent = os.path.dirname(os.path.abspath(dest_path))
+        while parent != root and parent.startswith(root + os.sep):
+            if os.listdir(parent):
+                break
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+    return pruned
+
+def generate_pages_incremental(dir_path_content, template_path, dest_dir_path, basepath, manifest_path, jobs=1, build=build_pages, pages=None):
+    '''
+    Like generate_pages_recursive, but only re-renders pages whose source,
+    template or basepath changed since the build recorded in manifest_path,
+    and prunes outputs whose sources were deleted. Stale pages are rendered
+    through build (build_pages or a drop-in replacement) with the given
+    number of jobs.
+
+    pages - The (from_path, dest_path) pairs to consider, e.g. from
+    discovery.discover; by default dir_path_content is scanned
+    '''
+    manifest = load_manifest(manifest_path)
+    old_pages = manifest["pages"]
+    entries_path = site_index.entries_path(manifest_path)
+    recorded = site_index.load_entries(entries_path)
+    new_pages = {}
+    template_hash = hash_file(template_path)
+    stale = []
+
+    if pages is None:
+        pages = collect_pages(dir_path_content, dest_dir_path)
+    for from_path, dest_path in pages:
+        entry = page_entry(from_path, template_hash, basepath)
+        # Without recorded metadata the page is rendered again to collect it
+        if (old_pages.get(dest_path) != entry or not os.path.isfile(dest_path)
+                or dest_path not in recorded):
+            stale.append((from_path, dest_path))
+        new_pages[dest_path] = entry
+
+    pruned = prune_outputs(old_pages, new_pages, dest_dir_path)
+
+    try:
+        build(stale, template_path, basepath, jobs)
+    except PageBuildError as e:
+        # Forget the failed pages so the next build retries them
+        failed = set(from_path for from_path, _ in e.failures)
+        for dest_path, entry in list(new_pages.items()):
+            if entry["source"] in failed:
+                del new_pages[dest_path]
+        raise
+    finally:
+        # Pages skipped this time keep the metadata recorded when they were
+        # last rendered, so site_index again covers the whole site
+        rendered = site_index.drain()
+        site_index.merge({dest_path: entry for dest_path, entry in recorded.items() if dest_path in new_pages})
+        site_index.merge({dest_path: entry for dest_path, entry in rendered.items() if dest_path in new_pages})
+        # Saved first: a manifest newer than the entries would mark pages
+        # up to date whose entries were never written
+        if rendered or len(site_index.pages) != len(recorded):
+            site_index.save_entries(site_index.pages, entries_path)
+        manifest["pages"] = new_pages
+        save_manifest(manifest, manifest_path)
+
+    skipped = len(new_pages) - len(stale)
+    print(f"Rendered {len(stale)}, unchanged {skipped}, pruned {len(pruned)}")
+    return len(stale), skipped, len(pruned)
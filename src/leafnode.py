@@ -1,17 +1,41 @@
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, PRESERVE_TAGS, VOID_TAGS
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def ___init__(self, tag, value, props=None):
         super().__init__(tag=tag, value=value, children=None, props=props)
 
-    def to_html(self):
+    def to_html(self, minifier=None):
         if self.value is None:
             raise ValueError("No value provided for HTML")
         
+        if minifier is not None:
+            return self._minified_html(minifier)
+
         if self.tag is None:
             return str(self.value)
         
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def _minified_html(self, minifier):
+        if self.tag is None:
+            return minifier.text(str(self.value))
+        if self.tag in VOID_TAGS and self.value == "":
+            minifier.saved += len(self.tag) + 3
+            return f"<{self.tag}{self.props_to_html()}>"
+        value = str(self.value) if self.tag in PRESERVE_TAGS else minifier.text(str(self.value))
+        return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
+
+    def iter_html(self, minifier=None):
+        yield self.to_html(minifier)
+
+    def _append_html(self, parts, minifier=None):
+        parts.append(self.to_html(minifier))
+
+    def _append_text(self, parts):
+        if self.value is not None:
+            parts.append(str(self.value))
+
     def __repr__(self):
         return f"{self.__class__.__name__}({self.tag}, {self.value}, {self.props})"
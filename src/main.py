@@ -1,35 +1,262 @@
+import argparse
+import functools
 import os
-import shutil
 import sys
 import textnode as tn
 
-from textnode import (
-    copy_static_to_public,
-    generate_page,
-    generate_pages_recursive,
-)
+from async_build import build_pages_with_asyncio
+from discovery import IGNORE_PATTERNS, discover
+from incremental import generate_pages_incremental
+from manifest import load_manifest, manifest_path_for, save_manifest
+from scheduler import PageBuildError, build_pages
+import fingerprint
+import precompress
+import profiling
+import render_cache
+import site_index
+import static_sync
+import stats
+from serve import SiteStore, make_server
+from watch import Watcher
 
 static_dir = "./static"
 public_dir = "./docs"
 content_dir = "./content"
 template_path = "./template.html"
 default_base = "/"
+default_profile_path = "./build-profile.json"
+default_cache_dir = "./.build-cache"
+default_site_url = "https://thedevscott.github.io"
 
-def main():
-    basepath = default_base
+def add_site_arguments(parser):
+    '''
+    Arguments describing the site, shared by the build and serve
+    '''
+    parser.add_argument("basepath", nargs="?", default=default_base,
+                        help="URL prefix the site is served from (default: /)")
+    parser.add_argument("--content", default=content_dir, metavar="DIR",
+                        help=f"markdown to render (default: {content_dir})")
+    parser.add_argument("--static", default=static_dir, metavar="DIR",
+                        help=f"files copied as they are (default: {static_dir})")
+    parser.add_argument("--template", default=template_path, metavar="PATH",
+                        help=f"page template (default: {template_path})")
+    parser.add_argument("--site-url", default=default_site_url, metavar="URL",
+                        help="scheme and host the site is published at, for the sitemap and feed "
+                        f"(default: {default_site_url})")
+    parser.add_argument("--ignore", action="append", default=[], metavar="GLOB",
+                        help="skip content and static files or directories matching GLOB, by name "
+                        "or by path relative to content/ or static/ (repeatable)")
 
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Generate the static site from markdown content. "
+        "Run 'main.py serve --help' for the development server.")
+    add_site_arguments(parser)
+    parser.add_argument("--output", default=public_dir, metavar="DIR",
+                        help=f"where the site is written (default: {public_dir})")
+    parser.add_argument("--incremental", action="store_true",
+                        help="keep the public directory and only re-render pages whose inputs changed")
+    parser.add_argument("--watch", action="store_true",
+                        help="after an incremental build, keep running and rebuild whatever content, "
+                        "static files or template change")
+    parser.add_argument("--static-hash", action="store_true",
+                        help="also compare static file contents, not just size and mtime")
+    parser.add_argument("--static-link", action="store_true",
+                        help="hardlink static files into the public directory where possible")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse the rendered HTML of unchanged markdown from an on-disk cache")
+    parser.add_argument("--cache-dir", default=default_cache_dir, metavar="DIR",
+                        help=f"where --cache keeps its entries (default: {default_cache_dir})")
+    parser.add_argument("--cache-size", type=int, default=render_cache.DEFAULT_MAX_BYTES // (1024 * 1024),
+                        metavar="MB", help="size cap for --cache, least recently used entries go first (default: %(default)s)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="overlap reading and writing files with rendering using asyncio")
+    parser.add_argument("--io-concurrency", type=int, default=32, metavar="N",
+                        help="with --async, pages read ahead or in flight at once (default: 32)")
+    parser.add_argument("--fsync", action="store_true",
+                        help="with --async, fsync every page as it is written")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="also write CSS, JS, images and fonts as name.<hash>.ext, list them in "
+                        f"{fingerprint.ASSET_MANIFEST_PATH} and link pages to those, so they can be "
+                        "cached forever")
+    parser.add_argument("--minify", action="store_true",
+                        help="write compact HTML: minify the template once and serialize content "
+                        "without redundant whitespace, leaving <pre> and <code> exactly as written")
+    parser.add_argument("--gzip", action="store_true",
+                        help="write a .gz next to every output worth compressing, for servers that "
+                        "serve precompressed files (e.g. nginx gzip_static)")
+    parser.add_argument("--gzip-min-size", type=int, default=precompress.MIN_SIZE, metavar="BYTES",
+                        help="with --gzip, leave outputs smaller than this uncompressed (default: %(default)s)")
+    parser.add_argument("--max-page-size", type=float, default=tn.parse_limits.max_input_size / (1024 * 1024),
+                        metavar="MB", help="fail pages whose markdown is larger than this (default: %(default)s)")
+    parser.add_argument("--parse-timeout", type=float, default=tn.parse_limits.max_seconds, metavar="SECONDS",
+                        help="after this long parsing one page, render the rest of it as plain text "
+                        "(default: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N",
+                        help="render pages on N worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--profile", nargs="?", const=default_profile_path, metavar="PATH",
+                        help="time each build phase and page, print a summary and "
+                        f"write a JSON report to PATH (default: {default_profile_path})")
+    args = parser.parse_args(argv)
+    if args.fingerprint and args.watch:
+        parser.error("--fingerprint cannot be combined with --watch")
+    return args
 
-    print("Deleting public directory...")
-    if os.path.exists(public_dir):
-        shutil.rmtree(public_dir)
-    
-    print("Copying static contents to public directory")
-    copy_static_to_public(static_dir, public_dir)
+def parse_serve_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py serve",
+        description="Render the site into memory and serve it, re-rendering whatever changes")
+    add_site_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8888, help="port to listen on (default: %(default)s)")
+    parser.add_argument("--interval", type=float, default=0.5, metavar="SECONDS",
+                        help="how often sources are checked for changes (default: %(default)s)")
+    return parser.parse_args(argv)
+
+def serve(argv):
+    args = parse_serve_args(argv)
+    store = SiteStore(args.content, args.static, args.template, args.basepath,
+                      args.site_url, ignore_patterns(args))
+    print(f"Rendered {store.load()} resource(s) into memory")
+    store.watch(args.interval)
+
+    server = make_server(store, args.host, args.port)
+    print(f"Serving http://{args.host}:{args.port}{args.basepath} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped serving")
+    finally:
+        server.server_close()
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        return serve(argv[1:])
+    args = parse_args(argv)
+    if args.watch:
+        args.incremental = True
+    tn.set_parse_limits(max_input_size=int(args.max_page_size * 1024 * 1024), max_seconds=args.parse_timeout)
+    tn.set_minify(args.minify)
+    if args.profile:
+        profiler = profiling.enable()
+    if args.cache:
+        cache = render_cache.configure(args.cache_dir, args.cache_size * 1024 * 1024)
+    try:
+        build(args)
+        print(f"Outputs written: {stats.get('outputs_written')}, "
+              f"unchanged and left alone: {stats.get('outputs_skipped')}")
+        if args.minify:
+            print(f"Minify saved {stats.get('minify_bytes_saved')} bytes across the pages rendered")
+    except PageBuildError as e:
+        print(f"Build failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if args.cache:
+            evicted = cache.prune()
+            if evicted:
+                stats.incr("render_cache_evicted", evicted)
+        if stats.counters:
+            print(f"Build stats: {stats.summary()}")
+        if args.profile:
+            print(profiler.summary())
+            profiler.write_json(args.profile)
+            print(f"Profile written to {args.profile}")
+            profiling.disable()
+
+    if args.watch:
+        watcher = Watcher(args.content, args.static, args.template, args.output,
+                          args.basepath, manifest_path_for(args.output), static_link=args.static_link,
+                          ignore=ignore_patterns(args), site_url=args.site_url,
+                          gzip_min_size=args.gzip_min_size if args.gzip else None)
+        watcher.start()
+        watcher.run()
+
+def ignore_patterns(args):
+    return IGNORE_PATTERNS + tuple(args.ignore)
+
+def page_builder(args):
+    if args.use_async:
+        return functools.partial(build_pages_with_asyncio,
+                                 concurrency=args.io_concurrency, fsync=args.fsync)
+    return build_pages
+
+def write_site_index(entries, args):
+    print("Writing sitemap, feed and search index...")
+    for rel_path, text in site_index.artifacts(entries, args.output, args.basepath, args.site_url).items():
+        tn.write_page(os.path.join(args.output, rel_path), text)
+
+def precompress_outputs(outputs, args):
+    if not args.gzip:
+        # Outputs that are static .gz files stay; compressed copies of
+        # pages and assets a --gzip build left would go stale
+        removed = precompress.remove_archives(args.output, outputs)
+        if removed:
+            print(f"Gzip: removed {len(removed)} .gz file(s) left by an earlier --gzip build")
+        return set()
+    print("Compressing outputs...")
+    return precompress.precompress_outputs(args.output, outputs, args.jobs or None, args.gzip_min_size)
+
+def fingerprint_assets(site, args):
+    if not args.fingerprint:
+        tn.set_asset_manifest(None)
+        fingerprint.remove_fingerprints(args.output)
+        return set()
+    print("Fingerprinting static assets...")
+    assets = fingerprint.fingerprint_static(args.static, args.output, site.assets,
+                                            link=args.static_link, jobs=args.jobs or None)
+    tn.set_asset_manifest(assets)
+    return assets.outputs() | {fingerprint.ASSET_MANIFEST_PATH}
+
+def build(args):
+    basepath = args.basepath
+    content_dir, static_dir, template_path, public_dir = args.content, args.static, args.template, args.output
+    build_func = page_builder(args)
+    manifest_path = manifest_path_for(public_dir)
+    site = discover(content_dir, static_dir, public_dir, ignore_patterns(args))
+    print(f"Found {len(site.pages)} page(s) and {len(site.assets)} static file(s)")
+
+    if args.incremental:
+        print("Syncing static contents to public directory")
+        manifest = load_manifest(manifest_path)
+        manifest["static"] = static_sync.sync_static(
+            static_dir, public_dir, manifest["static"],
+            use_hash=args.static_hash, link=args.static_link, files=site.assets,
+        )
+        save_manifest(manifest, manifest_path)
+        asset_outputs = fingerprint_assets(site, args)
+
+        print("Generating changed content...")
+        generate_pages_incremental(content_dir, template_path, public_dir, basepath,
+                                   manifest_path, args.jobs, build_func, site.pages)
+        write_site_index(site_index.drain(), args)
+        precompress_outputs(site.outputs(public_dir) | asset_outputs | set(site_index.ARTIFACT_PATHS), args)
+        return
+
+    # Outputs are updated in place rather than deleted up front, so files
+    # that come out the same keep their mtime and are not re-deployed
+    print("Syncing static contents to public directory")
+    static_sync.sync_static(
+        static_dir, public_dir, use_hash=args.static_hash, link=args.static_link, files=site.assets,
+    )
+    asset_outputs = fingerprint_assets(site, args)
+    # A full build invalidates whatever the last incremental build recorded
+    for path in (manifest_path, site_index.entries_path(manifest_path)):
+        if os.path.exists(path):
+            os.remove(path)
 
     print("Generating content...")
-    generate_pages_recursive(content_dir, template_path, public_dir, basepath)
+    site_index.reset()
+    build_func(site.pages, template_path, basepath, args.jobs)
+    write_site_index(site_index.drain(), args)
+    outputs = site.outputs(public_dir)
+    outputs.update(asset_outputs)
+    outputs.update(site_index.ARTIFACT_PATHS)
+    outputs.update(precompress_outputs(outputs, args))
+
+    print("Removing stale outputs...")
+    stale = [rel_path for rel_path in static_sync.list_files(public_dir) if rel_path not in outputs]
+    static_sync.remove_orphans(stale, public_dir)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
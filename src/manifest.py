@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 2
+
+def empty_manifest():
+    return {"version": MANIFEST_VERSION, "pages": {}, "static": []}
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def manifest_path_for(public_dir):
+    '''
+    Where incremental builds into public_dir keep their manifest: beside
+    the directory and named after it, e.g. ".docs.build-manifest.json" for
+    "./docs". Each output directory gets its own, so building into another
+    one never prunes this one's pages, and none is deployed with the site.
+    '''
+    parent, name = os.path.split(os.path.abspath(public_dir))
+    return os.path.join(parent, f".{name}.build-manifest.json")
+
+def load_manifest(manifest_path):
+    '''
+    Load the build manifest from disk. A missing, unreadable or outdated
+    manifest is treated as empty, which simply forces a full rebuild.
+    '''
+    if not os.path.exists(manifest_path):
+        return empty_manifest()
+
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return empty_manifest()
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return empty_manifest()
+
+    for key, value in empty_manifest().items():
+        manifest.setdefault(key, value)
+    return manifest
+
+def save_manifest(manifest, manifest_path):
+    manifest["version"] = MANIFEST_VERSION
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir != "":
+        os.makedirs(manifest_dir, exist_ok=True)
+
+    # Write next to the real file and swap it in so an interrupted build
+    # never leaves a truncated manifest behind
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        # Compact, since dumps only encodes in C without indent. Watch mode
+        # saves the manifest on every change.
+        f.write(json.dumps(manifest, separators=(",", ":"), sort_keys=True))
+    os.replace(tmp_path, manifest_path)
@@ -0,0 +1,109 @@
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import stats
+from discovery import scan
+
+GZIP_SUFFIX = ".gz"
+
+# Below this size the gzip header and a request for the .gz cost more
+# than compression saves
+MIN_SIZE = 256
+
+# Formats that are compressed already; gzip only makes them bigger
+COMPRESSED_SUFFIXES = (
+    ".gz", ".br", ".zst", ".zip", ".7z", ".bz2", ".xz",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".ico",
+    ".woff", ".woff2", ".mp3", ".mp4", ".webm", ".ogg", ".pdf",
+)
+
+
+def gzip_bytes(data, level=9):
+    '''
+    gzip data with a zeroed header timestamp, so the same input always
+    produces the same bytes
+    '''
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+def should_compress(rel_path, size, min_size=MIN_SIZE):
+    return size >= min_size and not rel_path.lower().endswith(COMPRESSED_SUFFIXES)
+
+def compress_file(path, min_size=MIN_SIZE):
+    '''
+    Write path + ".gz" next to path, unless it already matches path.
+
+    The .gz is given the mtime of its source (nginx's gzip_static checks the
+    same thing), so an output that write_page left alone keeps its .gz too.
+    A source that is missing, too small or already compressed loses any .gz
+    it had.
+
+    Returns "written", "unchanged" or "skipped".
+    '''
+    gz_path = path + GZIP_SUFFIX
+    try:
+        source = os.stat(path)
+    except FileNotFoundError:
+        source = None
+    if source is None or not should_compress(path, source.st_size, min_size):
+        if os.path.isfile(gz_path):
+            os.remove(gz_path)
+        return "skipped"
+
+    try:
+        if os.stat(gz_path).st_mtime_ns == source.st_mtime_ns:
+            return "unchanged"
+    except FileNotFoundError:
+        pass
+
+    with open(path, "rb") as f:
+        data = gzip_bytes(f.read())
+    tmp_path = gz_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.utime(tmp_path, ns=(source.st_atime_ns, source.st_mtime_ns))
+    os.replace(tmp_path, gz_path)
+    return "written"
+
+def precompress_outputs(public_dir, outputs, jobs=None, min_size=MIN_SIZE):
+    '''
+    Bring the .gz siblings of outputs up to date and delete .gz files in
+    public_dir that no output accounts for.
+
+    outputs - Paths relative to public_dir of every file the build produced
+    jobs - Number of compression threads (zlib releases the GIL), None for
+    the ThreadPoolExecutor default
+
+    Returns the set of .gz paths, relative to public_dir, that now exist.
+    '''
+    outputs = sorted(set(outputs))
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        compress = lambda rel_path: compress_file(os.path.join(public_dir, rel_path), min_size)
+        results = dict(zip(outputs, pool.map(compress, outputs)))
+
+    archives = {rel_path + GZIP_SUFFIX for rel_path, result in results.items() if result != "skipped"}
+    orphans = remove_archives(public_dir, archives.union(outputs))
+
+    written = sum(1 for result in results.values() if result == "written")
+    if written:
+        stats.incr("gzip_written", written)
+    print(f"Gzip: compressed {written}, unchanged {len(archives) - written}, "
+          f"removed {len(orphans)}")
+    return archives
+
+def remove_archives(public_dir, keep=()):
+    '''
+    Delete every .gz in public_dir that is not in keep, e.g. all of them
+    after a build without --gzip, which would otherwise leave nginx serving
+    the compressed copy of an outdated page. Returns the removed paths,
+    relative to public_dir.
+    '''
+    keep = set(keep)
+    removed = [
+        rel_path for rel_path in scan(public_dir, ignore=(), suffixes=(GZIP_SUFFIX,))
+        if rel_path not in keep
+    ]
+    for rel_path in removed:
+        os.remove(os.path.join(public_dir, rel_path))
+    return removed
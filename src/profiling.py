@@ -0,0 +1,211 @@
+import contextlib
+import functools
+import json
+import time
+
+import static_sync
+import textnode
+
+# (name, module, function) triples wrapped while profiling is enabled. The
+# wrappers replace the module attributes, so nothing is timed, counted or
+# even checked when profiling is off.
+PHASES = [
+    ("static sync", static_sync, "sync_static"),
+    ("markdown parse", textnode, "markdown_to_html_node"),
+    ("inline parse", textnode, "text_to_textnodes"),
+    ("serialize", textnode, "serialize_node"),
+    ("template", textnode, "render_page_html"),
+    ("write", textnode, "write_page"),
+]
+# Inline parsing runs inside markdown parsing, so its time is a subset
+NESTED_PHASES = {"inline parse"}
+
+_profiler = None
+_originals = {}
+_active = set()
+
+
+class Profiler():
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {name: [0, 0.0] for name, _, _ in PHASES}
+        self.counters = {"html_nodes": 0, "text_nodes": 0}
+        self.pages = []
+        self.current_page = None
+
+    def add_phase(self, name, seconds):
+        phase = self.phases.setdefault(name, [0, 0.0])
+        phase[0] += 1
+        phase[1] += seconds
+
+    def count(self, name, amount):
+        self.counters[name] = self.counters.get(name, 0) + amount
+        if self.current_page is not None:
+            self.current_page[name] = self.current_page.get(name, 0) + amount
+
+    def to_dict(self):
+        return {
+            "wall_seconds": time.perf_counter() - self.started,
+            "phases": {
+                name: {"calls": calls, "seconds": seconds}
+                for name, (calls, seconds) in self.phases.items()
+            },
+            "counters": dict(self.counters),
+            "pages": list(self.pages),
+        }
+
+    def merge(self, data):
+        '''
+        Fold in the phases, counters and pages recorded by another profiler,
+        e.g. one running in a worker process
+        '''
+        for name, phase in data["phases"].items():
+            totals = self.phases.setdefault(name, [0, 0.0])
+            totals[0] += phase["calls"]
+            totals[1] += phase["seconds"]
+        for name, amount in data["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + amount
+        self.pages.extend(data["pages"])
+
+    def summary(self, slowest=5):
+        data = self.to_dict()
+        wall = data["wall_seconds"]
+        lines = [f"{'phase':<18} {'calls':>8} {'total ms':>10} {'% wall':>7}"]
+        for name, phase in data["phases"].items():
+            label = "  " + name if name in NESTED_PHASES else name
+            share = phase["seconds"] / wall * 100 if wall else 0.0
+            lines.append(f"{label:<18} {phase['calls']:>8} {phase['seconds'] * 1000:>10.1f} {share:>6.1f}%")
+        lines.append(f"{'wall':<18} {'':>8} {wall * 1000:>10.1f}")
+        lines.append(f"pages: {len(data['pages'])}, " + ", ".join(
+            f"{name}: {amount}" for name, amount in sorted(data["counters"].items())
+        ))
+
+        pages = sorted(data["pages"], key=lambda page: page["seconds"], reverse=True)
+        if pages:
+            lines.append("slowest pages:")
+            for page in pages[:slowest]:
+                lines.append(f"\t{page['seconds'] * 1000:8.1f} ms  {page['html_nodes']:>6} nodes  {page['path']}")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+
+def _timed(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Re-entrant calls count once, at the top
+        if name in _active:
+            return func(*args, **kwargs)
+        _active.add(name)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _active.discard(name)
+            _profiler.add_phase(name, time.perf_counter() - start)
+    return wrapper
+
+def _count_html_nodes(node):
+    count = 1
+    for child in node.children or []:
+        count += _count_html_nodes(child)
+    return count
+
+def _wrap_markdown_to_html_node(func):
+    timed = _timed("markdown parse", func)
+
+    @functools.wraps(func)
+    def wrapper(markdown, *args, **kwargs):
+        node = timed(markdown, *args, **kwargs)
+        _profiler.count("html_nodes", _count_html_nodes(node))
+        return node
+    return wrapper
+
+def _wrap_text_to_textnodes(func):
+    timed = _timed("inline parse", func)
+
+    @functools.wraps(func)
+    def wrapper(text):
+        nodes = timed(text)
+        _profiler.count("text_nodes", len(nodes))
+        return nodes
+    return wrapper
+
+@contextlib.contextmanager
+def _timed_page(path):
+    page = {"path": path, "html_nodes": 0, "text_nodes": 0}
+    _profiler.current_page = page
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        page["seconds"] = time.perf_counter() - start
+        _profiler.current_page = None
+        _profiler.pages.append(page)
+
+def page(path):
+    '''
+    Record whatever runs inside as one page of the report. For build paths
+    that do not go through generate_page, such as the async build. Does
+    nothing while profiling is off.
+    '''
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _timed_page(path)
+
+def _wrap_generate_page(func):
+    @functools.wraps(func)
+    def wrapper(from_path, template_path, dest_path, basepath):
+        with _timed_page(from_path):
+            return func(from_path, template_path, dest_path, basepath)
+    return wrapper
+
+WRAPPERS = {
+    "markdown_to_html_node": _wrap_markdown_to_html_node,
+    "text_to_textnodes": _wrap_text_to_textnodes,
+    "generate_page": _wrap_generate_page,
+}
+
+def enable():
+    '''
+    Start a fresh profiler and install the timing wrappers into textnode.
+    Calling it again (e.g. in a forked worker) only resets the profiler.
+    '''
+    global _profiler
+    _profiler = Profiler()
+    if _originals:
+        return _profiler
+
+    for name, module, attr in PHASES + [("page", textnode, "generate_page")]:
+        func = getattr(module, attr)
+        _originals[(module, attr)] = func
+        if attr in WRAPPERS:
+            setattr(module, attr, WRAPPERS[attr](func))
+        else:
+            setattr(module, attr, _timed(name, func))
+    return _profiler
+
+def disable():
+    global _profiler
+    for (module, attr), func in _originals.items():
+        setattr(module, attr, func)
+    _originals.clear()
+    _profiler = None
+
+def is_enabled():
+    return _profiler is not None
+
+def get_profiler():
+    return _profiler
+
+def drain():
+    '''
+    Return everything recorded so far as a dict and start over. Used to ship
+    a worker's measurements back to the parent after each page.
+    '''
+    global _profiler
+    data = _profiler.to_dict()
+    _profiler = Profiler()
+    return data
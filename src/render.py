@@ -0,0 +1,110 @@
+'''
+Render markdown held in memory into HTML pages, without touching the
+filesystem or printing anything.
+
+    import render
+    html = render.render_page("# Hello\n\nWorld", "<h1>{{ Title }}</h1>{{ Content }}")
+    for page in render.render_site([("blog/post.md", markdown)], template, "/site/"):
+        store[page.path] = page.html
+
+The file-based build (main.py) shares the parsing and serialization:
+textnode.generate_page streams each file through
+textnode.content_from_lines, which render_content reaches through
+textnode.content_from_markdown, or reads it into textnode.content_from_bytes
+when a render cache is configured, as render_content does with bytes.
+Templates, writes and progress output are the build's own.
+'''
+from htmlnode import Minifier
+from scheduler import PageBuildError
+from template import Template
+import render_cache
+import textnode
+
+
+class RenderedPage():
+    __slots__ = ("path", "title", "html", "text")
+
+    def __init__(self, path, title, html, text):
+        '''
+        path - Where the page belongs in the output tree, e.g.
+        "blog/post/index.html" for "blog/post/index.md"
+        title - The page's first heading
+        html - The complete page, template and basepath applied
+        text - The page's plain text, without markup
+        '''
+        self.path = path
+        self.title = title
+        self.html = html
+        self.text = text
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.path}, {self.title})"
+
+
+def compile_template(template, basepath="/"):
+    '''
+    template - Template text containing {{ Title }} and {{ Content }}, or
+    an already compiled Template, which keeps the basepath it was
+    compiled with. Text is compiled with the minify and asset settings of
+    textnode.set_minify and textnode.set_asset_manifest.
+    '''
+    if isinstance(template, Template):
+        return template
+    return Template(template, basepath, textnode.minify_html, textnode.asset_manifest)
+
+def render_content(markdown):
+    '''
+    Return the title, content HTML and plain text of one markdown document,
+    given as a string or UTF-8 bytes. Parsing is bounded by
+    textnode.parse_limits; the render cache is only used if the caller
+    configured one.
+    '''
+    if isinstance(markdown, bytes):
+        document = textnode.content_from_bytes(markdown)
+    elif render_cache.get_cache() is not None:
+        document = textnode.content_from_bytes(markdown.encode("utf-8"))
+    else:
+        document = textnode.content_from_markdown(markdown)
+    title, content, text, _ = document
+    return title, content, text
+
+def render_page(markdown, template, basepath="/"):
+    '''
+    Render one markdown document into a complete HTML page
+    '''
+    template = compile_template(template, basepath)
+    title, content, _ = render_content(markdown)
+    return textnode.render_page_html(template, title, content)
+
+def iter_render_page(markdown, template, basepath="/"):
+    '''
+    Like render_page, but yield the page in chunks as the HTML tree is
+    serialized, so a response can start before the page is fully built
+    '''
+    template = compile_template(template, basepath)
+    if isinstance(markdown, bytes):
+        markdown = markdown.decode("utf-8")
+    title = textnode.extract_title(markdown)
+    node = textnode.markdown_to_html_node(markdown)
+    minifier = Minifier() if textnode.minify_html else None
+    yield from template.iter_render(title, node.iter_html(minifier))
+
+def render_site(pages, template, basepath="/"):
+    '''
+    pages - Any iterable of (path, markdown) pairs, such as a list or a
+    generator reading from a database. path is relative to the content
+    root, e.g. "blog/post/index.md"
+
+    Yield a RenderedPage per input in the same order. The template is
+    compiled once, and pages are consumed lazily, so any number can be
+    streamed through. A page that fails to render raises PageBuildError
+    naming its path.
+    '''
+    template = compile_template(template, basepath)
+    for path, markdown in pages:
+        try:
+            title, content, text = render_content(markdown)
+        except Exception as e:
+            raise PageBuildError([(path, f"{type(e).__name__}: {e}")]) from e
+        html = textnode.render_page_html(template, title, content)
+        yield RenderedPage(textnode.page_dest_path(path), title, html, text)
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_cache = None
+
+
+class RenderCache():
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        '''
+        cache_dir - Directory holding one JSON file per rendered page
+        max_bytes - Size cap enforced by prune(), least recently used first
+
+        Entries map the hash of a markdown file (plus the parser version) to
+        its title, content HTML and plain text, i.e. everything before the
+        template and basepath are applied. The cache is plain files written atomically,
+        so several worker processes can share it.
+        '''
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, data, version):
+        digest = hashlib.sha256(version.encode())
+        digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            cached = entry["title"], entry["html"], entry["text"], entry["metadata"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        # Bump the mtime so prune() sees the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return cached
+
+    def put(self, key, title, html, text="", metadata=None):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"title": title, "html": html, "text": text, "metadata": metadata or {}}, f)
+        os.replace(tmp_path, path)
+
+    def prune(self):
+        '''
+        Evict the least recently used entries until the cache fits in
+        max_bytes. Returns the number of entries removed.
+        '''
+        entries = []
+        total = 0
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            evicted += 1
+        return evicted
+
+    def settings(self):
+        return self.cache_dir, self.max_bytes
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.cache_dir}, {self.max_bytes})"
+
+
+def configure(cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+    '''
+    Turn on the render cache for generate_page in this process
+    '''
+    global _cache
+    _cache = RenderCache(cache_dir, max_bytes)
+    return _cache
+
+def disable():
+    global _cache
+    _cache = None
+
+def get_cache():
+    return _cache
@@ -0,0 +1,142 @@
+import contextlib
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import profiling
+import render_cache
+import site_index
+import stats
+import textnode
+from fingerprint import AssetManifest
+
+_in_worker = False
+
+
+class PageBuildError(Exception):
+    def __init__(self, failures):
+        '''
+        failures - A list of (from_path, message) tuples, one per page that
+        could not be rendered
+        '''
+        self.failures = failures
+        paths = ", ".join(from_path for from_path, _ in failures)
+        super().__init__(f"{len(failures)} page(s) failed to render: {paths}")
+
+
+def resolve_jobs(jobs):
+    if jobs is None or jobs < 1:
+        return os.cpu_count() or 1
+    return jobs
+
+def worker_settings():
+    '''
+    Per-process state the workers need to mirror, passed to init_worker
+    explicitly rather than relying on fork to copy it
+    '''
+    cache = render_cache.get_cache()
+    return {
+        "profile": profiling.is_enabled(),
+        "render_cache": cache.settings() if cache is not None else None,
+        "parse_limits": textnode.parse_limits.settings(),
+        "minify": textnode.minify_html,
+        "assets": textnode.asset_manifest.names if textnode.asset_manifest is not None else None,
+    }
+
+def init_worker(settings):
+    global _in_worker
+    _in_worker = True
+    stats.reset()
+    site_index.reset()
+    if settings["profile"]:
+        profiling.enable()
+    if settings["render_cache"] is not None:
+        render_cache.configure(*settings["render_cache"])
+    else:
+        render_cache.disable()
+    textnode.set_parse_limits(*settings["parse_limits"])
+    textnode.set_minify(settings["minify"])
+    if settings["assets"] is not None:
+        textnode.set_asset_manifest(AssetManifest(settings["assets"]))
+
+def render_task(task):
+    '''
+    Render a single page. Runs inside a worker process, so output is captured
+    and handed back to the parent, which prints it in page order, and any
+    error is returned together with the offending path instead of raised.
+    A worker's profiling measurements and build stats are returned the same
+    way.
+    '''
+    from_path, template_path, dest_path, basepath = task
+    log = io.StringIO()
+    error = None
+    try:
+        with contextlib.redirect_stdout(log):
+            textnode.generate_page(from_path, template_path, dest_path, basepath)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    return from_path, log.getvalue(), error, worker_reports()
+
+def worker_reports():
+    '''
+    In a worker process, hand over (and reset) the profiling data, build
+    stats and page metadata gathered since the last call. Returns None in
+    the main process, where they are recorded directly.
+    '''
+    if not _in_worker:
+        return None
+    return {
+        "profile": profiling.drain() if profiling.is_enabled() else None,
+        "stats": stats.drain(),
+        "pages": site_index.drain(),
+    }
+
+def merge_worker_reports(reports):
+    if reports is None:
+        return
+    if reports["profile"] is not None:
+        profiling.get_profiler().merge(reports["profile"])
+    stats.merge(reports["stats"])
+    site_index.merge(reports["pages"])
+
+def build_pages(pages, template_path, basepath, jobs=1, chunksize=None):
+    '''
+    pages - A list of (from_path, dest_path) tuples, e.g. from collect_pages
+    jobs - Number of worker processes. 1 renders in this process, None or 0
+    uses one worker per CPU
+    chunksize - Pages handed to a worker at a time. Defaults to splitting
+    the list into roughly four batches per worker
+
+    Logs are printed in the order of pages regardless of which worker
+    finished first. Every page is attempted; if any fail, PageBuildError is
+    raised afterwards listing them.
+    '''
+    tasks = [(from_path, template_path, dest_path, basepath) for from_path, dest_path in pages]
+    jobs = min(resolve_jobs(jobs), max(len(tasks), 1))
+    failures = []
+
+    with contextlib.ExitStack() as stack:
+        if jobs == 1:
+            results = map(render_task, tasks)
+        else:
+            if chunksize is None:
+                chunksize = max(1, len(tasks) // (jobs * 4))
+            pool = stack.enter_context(ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=init_worker,
+                initargs=(worker_settings(),),
+            ))
+            results = pool.map(render_task, tasks, chunksize=chunksize)
+
+        for from_path, log, error, reports in results:
+            merge_worker_reports(reports)
+            print(log, end="")
+            if error is not None:
+                print(f"\t! {from_path}: {error}", file=sys.stderr)
+                failures.append((from_path, error))
+
+    if failures:
+        raise PageBuildError(failures)
+    return len(tasks)
@@ -0,0 +1,333 @@
+import hashlib
+import mimetypes
+import os
+import sys
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import discovery
+import site_index
+import textnode
+from precompress import MIN_SIZE, gzip_bytes
+from watch import diff_snapshots, snapshot
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/xml", "application/rss+xml",
+                      "application/javascript", "image/svg+xml")
+TEXT_TYPES = ("text/", "application/json", "application/xml", "application/rss+xml", "application/javascript")
+
+
+def content_type(rel_path):
+    guessed = mimetypes.guess_type(rel_path)[0]
+    if rel_path.endswith(".json"):
+        guessed = "application/json"
+    elif rel_path.endswith(".xml"):
+        guessed = "application/rss+xml" if rel_path.endswith("rss.xml") else "application/xml"
+    guessed = guessed or "application/octet-stream"
+    if guessed.startswith(TEXT_TYPES):
+        guessed += "; charset=utf-8"
+    return guessed
+
+
+class Resource():
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag", "last_modified", "mtime", "content_type", "status")
+
+    def __init__(self, body, content_type, mtime, status=HTTPStatus.OK):
+        '''
+        One response, prepared once: the body, its gzip encoding (if worth
+        having), a strong ETag for each of the two, and Last-Modified from
+        the source's mtime. The encodings are different representations, so
+        they never share a strong validator.
+        '''
+        self.body = body
+        self.content_type = content_type
+        self.status = status
+        self.mtime = int(mtime)
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:20] + '"'
+        self.gzip_body = self.gzip_etag = None
+        if len(body) >= MIN_SIZE and content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip_bytes(body)
+            if len(compressed) < len(body):
+                self.gzip_body = compressed
+                self.gzip_etag = self.etag[:-1] + '-gz"'
+
+    def etags(self):
+        return (self.etag,) if self.gzip_etag is None else (self.etag, self.gzip_etag)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.content_type}, {len(self.body)} bytes, {self.etag})"
+
+
+class SiteStore():
+    def __init__(self, content_dir, static_dir, template_path, basepath="/", site_url="",
+                 ignore=discovery.IGNORE_PATTERNS):
+        '''
+        The whole site rendered into memory and kept up to date with its
+        sources. Pages go through the same steps as generate_page, minus
+        the write; static files are read as they are.
+
+        Resources are keyed by their path below basepath, e.g.
+        "blog/post/index.html". refresh() re-renders just the entries whose
+        sources changed (every page, from parsed content, for the template).
+        '''
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.basepath = basepath
+        self.site_url = site_url
+        self.ignore_matcher = discovery.compile_ignore(ignore)
+        self.ignore = ignore
+
+        self.resources = {}
+        # from_path -> (title, content html), or None if it failed
+        self.documents = {}
+        # Sitemap, feed and search entries, keyed by rel_path
+        self.index = site_index.PageIndex()
+        self.snapshots = {}
+        self.lock = threading.Lock()
+
+    def rel_path(self, from_path):
+        return discovery.page_dest_path(os.path.relpath(from_path, self.content_dir))
+
+    def static_rel_path(self, from_path):
+        return os.path.relpath(from_path, self.static_dir)
+
+    def key(self, rel_path):
+        return rel_path.replace(os.sep, "/")
+
+    def load(self):
+        '''
+        Render every page and read every static file. Returns the number of
+        resources stored.
+        '''
+        self.snapshots = self.take_snapshots()
+        site = discovery.discover(self.content_dir, self.static_dir, "", self.ignore)
+        for rel_path in site.assets:
+            self.load_static(os.path.join(self.static_dir, rel_path))
+        for from_path, _ in site.pages:
+            self.parse(from_path)
+        self.render_pages(self.documents)
+        self.render_site_index()
+        return len(self.resources)
+
+    def take_snapshots(self):
+        def watched(files, root, suffixes=None):
+            return {
+                path: stamp for path, stamp in files.items()
+                if discovery.accepts(self.ignore_matcher, os.path.relpath(path, root), suffixes)
+            }
+        return {
+            "content": watched(snapshot(self.content_dir), self.content_dir, discovery.PAGE_SUFFIXES),
+            "static": watched(snapshot(self.static_dir), self.static_dir) if os.path.isdir(self.static_dir) else {},
+            "template": snapshot(self.template_path),
+        }
+
+    def parse(self, from_path):
+        rel_path = self.rel_path(from_path)
+        try:
+            title, content, text, metadata = textnode.page_document(from_path)
+            self.documents[from_path] = title, content
+            self.index.add(rel_path, site_index.page_entry(from_path, title, text, metadata))
+        except Exception as e:
+            self.documents[from_path] = None
+            self.index.remove(rel_path)
+            message = f"{type(e).__name__}: {e}"
+            print(f"\t! {from_path}: {message}", file=sys.stderr)
+            self.store(rel_path, Resource(
+                message.encode("utf-8"), "text/plain; charset=utf-8", time.time(),
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+            ))
+
+    def render_pages(self, from_paths):
+        template = textnode.page_template(self.template_path, self.basepath)
+        template_mtime = os.stat(self.template_path).st_mtime
+        for from_path in from_paths:
+            document = self.documents.get(from_path)
+            if document is None:
+                continue
+            title, content = document
+            page = textnode.render_page_html(template, title, content)
+            mtime = max(os.stat(from_path).st_mtime, template_mtime)
+            rel_path = self.rel_path(from_path)
+            self.store(rel_path, Resource(page.encode("utf-8"), content_type(rel_path), mtime))
+
+    def render_site_index(self):
+        mtime = max((entry["mtime"] for entry in self.index.entries.values()), default=time.time())
+        for rel_path, text in site_index.artifacts(self.index, os.curdir, self.basepath, self.site_url).items():
+            self.store(rel_path, Resource(text.encode("utf-8"), content_type(rel_path), mtime))
+
+    def load_static(self, from_path):
+        with open(from_path, "rb") as f:
+            body = f.read()
+        rel_path = self.static_rel_path(from_path)
+        self.store(rel_path, Resource(body, content_type(rel_path), os.stat(from_path).st_mtime))
+
+    def store(self, rel_path, resource):
+        with self.lock:
+            self.resources[self.key(rel_path)] = resource
+
+    def drop(self, rel_path):
+        with self.lock:
+            self.resources.pop(self.key(rel_path), None)
+
+    def get(self, key):
+        with self.lock:
+            return self.resources.get(key)
+
+    def refresh(self):
+        '''
+        Bring changed entries up to date. Returns the number of sources
+        that changed.
+        '''
+        before = self.snapshots
+        after = self.take_snapshots()
+        self.snapshots = after
+
+        content_changed, content_removed = diff_snapshots(before["content"], after["content"])
+        static_changed, static_removed = diff_snapshots(before["static"], after["static"])
+        template_changed = before["template"] != after["template"]
+
+        for from_path in content_changed:
+            self.parse(from_path)
+        for from_path in content_removed:
+            self.documents.pop(from_path, None)
+            self.index.remove(self.rel_path(from_path))
+            self.drop(self.rel_path(from_path))
+        self.render_pages(self.documents if template_changed else content_changed)
+        if content_changed or content_removed:
+            self.render_site_index()
+
+        for from_path in static_changed:
+            self.load_static(from_path)
+        for from_path in static_removed:
+            self.drop(self.static_rel_path(from_path))
+
+        changed = len(content_changed) + len(content_removed) + len(static_changed) + len(static_removed)
+        return changed + (1 if template_changed else 0)
+
+    def watch(self, interval=0.5):
+        '''
+        Call refresh every interval seconds on a daemon thread
+        '''
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    changed = self.refresh()
+                except Exception as e:
+                    print(f"\t! refresh failed: {type(e).__name__}: {e}", file=sys.stderr)
+                    continue
+                if changed:
+                    print(f"Reloaded {changed} changed source(s)")
+        thread = threading.Thread(target=run, name="site-store-watch", daemon=True)
+        thread.start()
+        return thread
+
+
+def accepts_gzip(header):
+    for coding in header.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+def not_modified(headers, resource):
+    '''
+    Conditional GET: If-None-Match wins over If-Modified-Since when both
+    are sent. The tag of either encoding matches, as both come from the
+    same body.
+    '''
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(etag in tags or "W/" + etag in tags for etag in resource.etags())
+    if_modified_since = headers.get("If-Modified-Since")
+    if if_modified_since is not None:
+        try:
+            return parsedate_to_datetime(if_modified_since).timestamp() >= resource.mtime
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class SiteRequestHandler(BaseHTTPRequestHandler):
+    store = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        path = unquote(urlsplit(self.path).path)
+        basepath = self.store.basepath
+        if not path.startswith(basepath):
+            if path + "/" == basepath:
+                return self.redirect(basepath)
+            return self.send_plain(HTTPStatus.NOT_FOUND, send_body)
+
+        key = path[len(basepath):]
+        if key == "" or key.endswith("/"):
+            key += "index.html"
+        resource = self.store.get(key)
+        if resource is None:
+            if self.store.get(key + "/index.html") is not None:
+                return self.redirect(path + "/")
+            return self.send_plain(HTTPStatus.NOT_FOUND, send_body)
+
+        use_gzip = resource.gzip_body is not None and accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        if resource.status == HTTPStatus.OK and not_modified(self.headers, resource):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_cache_headers(resource, use_gzip)
+            self.end_headers()
+            return
+
+        body = resource.gzip_body if use_gzip else resource.body
+        self.send_response(resource.status)
+        self.send_header("Content-Type", resource.content_type)
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_cache_headers(resource, use_gzip)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_cache_headers(self, resource, use_gzip):
+        '''
+        The validators of the body chosen, on a full response or a 304
+        '''
+        self.send_header("ETag", resource.gzip_etag if use_gzip else resource.etag)
+        if resource.gzip_body is not None:
+            self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Last-Modified", resource.last_modified)
+        self.send_header("Cache-Control", "no-cache")
+
+    def redirect(self, location):
+        self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def send_plain(self, status, send_body):
+        body = f"{status.value} {status.phrase}\n".encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+def make_server(store, host="127.0.0.1", port=8888):
+    '''
+    A threaded HTTP server answering from store, one thread per connection
+    '''
+    handler = type("BoundSiteRequestHandler", (SiteRequestHandler,), {"store": store})
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,343 @@
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+from discovery import relative_path
+from front_matter import parse_date
+
+SEARCH_INDEX_VERSION = 1
+ENTRIES_VERSION = 1
+
+# Where the artifacts go, relative to the public directory
+SITEMAP_PATH = "sitemap.xml"
+FEED_PATH = os.path.join("blog", "rss.xml")
+SEARCH_INDEX_PATH = "search-index.json"
+ARTIFACT_PATHS = (SITEMAP_PATH, FEED_PATH, SEARCH_INDEX_PATH)
+
+# Pages rendered below this directory of the public tree make up the feed
+FEED_SECTION = "blog"
+SUMMARY_LENGTH = 280
+
+WORD_PATTERN = re.compile(r"\w{2,}")
+
+# Metadata of the pages rendered by this process, keyed by dest_path.
+# Like stats.counters, worker processes drain theirs after every page and
+# the parent merges them.
+pages = {}
+
+
+def page_entry(from_path, title, text, metadata):
+    '''
+    Everything the sitemap, feed and search index need from a page, taken
+    from its plain text once so the text itself is not kept. metadata is
+    the page's front matter as the parse returned it, see
+    textnode.page_document, so the source is not read again.
+
+    "mtime" dates the page in the sitemap and feed: the front matter's
+    date if it has one, else the file's mtime. "summary" is the front
+    matter description, or else the start of the text. "terms" holds the
+    page's distinct search terms, sorted and joined by spaces.
+    '''
+    date = metadata.get("date")
+    return {
+        "source": from_path,
+        "title": title,
+        "mtime": int(parse_date(date) if date else os.stat(from_path).st_mtime),
+        "summary": metadata.get("description") or summary(text.removeprefix(title)),
+        "terms": " ".join(sorted(set(tokenize(title + "\n" + text)))),
+    }
+
+def record(dest_path, entry):
+    pages[dest_path] = entry
+
+def drain():
+    data = dict(pages)
+    pages.clear()
+    return data
+
+def merge(data):
+    pages.update(data)
+
+def reset():
+    pages.clear()
+
+
+def entries_path(manifest_path):
+    '''
+    Where the entries of the pages a build manifest lists are kept, e.g.
+    ".docs.build-manifest.index.json" next to ".docs.build-manifest.json".
+    They live outside the manifest, which stays small enough to rewrite on
+    every build and watch poll.
+    '''
+    root, ext = os.path.splitext(manifest_path)
+    return root + ".index" + (ext or ".json")
+
+def load_entries(path):
+    '''
+    The entries saved by save_entries, or {} if the file is missing,
+    unreadable or from another version
+    '''
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != ENTRIES_VERSION:
+        return {}
+    return data.get("pages", {})
+
+def save_entries(entries, path):
+    path_dir = os.path.dirname(path)
+    if path_dir != "":
+        os.makedirs(path_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        # dumps, unlike dump, encodes in C
+        f.write(json.dumps({"version": ENTRIES_VERSION, "pages": entries},
+                           ensure_ascii=False, separators=(",", ":"), sort_keys=True))
+    os.replace(tmp_path, path)
+
+
+class PageIndex():
+    __slots__ = ("entries", "postings", "gaps")
+
+    def __init__(self, entries=None):
+        '''
+        entries - {dest_path: entry} as made by page_entry
+
+        Holds the entries together with the search postings built from
+        their terms, updated a page at a time by add and remove, so a
+        watch or serve process that keeps one around re-encodes only the
+        terms of the pages that changed.
+        '''
+        self.entries = {}
+        # term -> set of dest_paths
+        self.postings = {}
+        # term -> its page number gaps as last encoded by search_index.
+        # Dropped when the term's pages change, and all of them when a page
+        # is added or removed, since that renumbers the pages.
+        self.gaps = {}
+        for dest_path, entry in (entries or {}).items():
+            self.add(dest_path, entry)
+
+    def add(self, dest_path, entry):
+        previous = self.entries.get(dest_path)
+        if previous is None:
+            self.gaps.clear()
+            old_terms = set()
+        else:
+            old_terms = set(previous["terms"].split())
+        new_terms = set(entry["terms"].split())
+        self.entries[dest_path] = entry
+        # Terms the page had before and still has keep their postings
+        self.unlink(dest_path, old_terms - new_terms)
+        for term in new_terms - old_terms:
+            self.postings.setdefault(term, set()).add(dest_path)
+            self.gaps.pop(term, None)
+
+    def remove(self, dest_path):
+        entry = self.entries.pop(dest_path, None)
+        if entry is not None:
+            self.unlink(dest_path, entry["terms"].split())
+            self.gaps.clear()
+
+    def unlink(self, dest_path, terms):
+        for term in terms:
+            dest_paths = self.postings[term]
+            dest_paths.discard(dest_path)
+            if not dest_paths:
+                del self.postings[term]
+            self.gaps.pop(term, None)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self.entries)} pages, {len(self.postings)} terms)"
+
+
+def page_url(dest_path, public_dir, basepath):
+    '''
+    The URL a page is served at, with index.html left off
+    '''
+    rel_path = relative_path(dest_path, public_dir).replace(os.sep, "/")
+    if rel_path == "index.html" or rel_path.endswith("/index.html"):
+        rel_path = rel_path[:-len("index.html")]
+    return basepath + rel_path
+
+def site_pages(entries, public_dir, basepath):
+    '''
+    Turn recorded entries into (rel_path, url, entry, dest_path) tuples
+    sorted by URL
+    '''
+    result = []
+    for dest_path, entry in entries.items():
+        rel_path = relative_path(dest_path, public_dir).replace(os.sep, "/")
+        result.append((rel_path, page_url(dest_path, public_dir, basepath), entry, dest_path))
+    return sorted(result, key=lambda item: item[1])
+
+def summary(text, length=SUMMARY_LENGTH):
+    # Each word takes at least two characters with its space, so this many
+    # already run past length and later ones never reach the summary
+    words = (length + 1) // 2 + 1
+    text = " ".join(text.split(maxsplit=words)[:words])
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0] + "..."
+
+# textnode imports this module, so every parse, in every worker, loads
+# whatever it imports. escape and format_datetime stand in for
+# xml.sax.saxutils and email.utils, which bring in urllib, http.client
+# and socket for two one-liners.
+
+def escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+def format_datetime(date):
+    '''
+    RFC 822 date for RSS, e.g. "Fri, 01 Mar 2024 00:00:00 +0000", for a
+    UTC datetime
+    '''
+    return (f"{DAY_NAMES[date.weekday()]}, {date.day:02d} {MONTH_NAMES[date.month - 1]} "
+            f"{date.year:04d} {date:%H:%M:%S} +0000")
+
+def timestamp(entry):
+    return datetime.fromtimestamp(entry["mtime"], timezone.utc)
+
+
+def sitemap_xml(site, site_url):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for _, url, entry, _ in site:
+        lines.append(
+            f"  <url><loc>{escape(site_url + url)}</loc>"
+            f"<lastmod>{timestamp(entry).date().isoformat()}</lastmod></url>"
+        )
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+def feed_xml(site, site_url, basepath):
+    '''
+    RSS 2.0 feed of the pages below FEED_SECTION, newest first. Dates come
+    from the source files, never the clock, so an unchanged site produces
+    an identical feed.
+    '''
+    section = FEED_SECTION + "/"
+    items = [item for item in site if item[0].startswith(section) and item[0] != section + "index.html"]
+    items.sort(key=lambda item: (-item[2]["mtime"], item[1]))
+
+    titles = {rel_path: entry["title"] for rel_path, _, entry, _ in site}
+    channel_title = titles.get(section + "index.html") or titles.get("index.html") or FEED_SECTION
+    channel_link = site_url + basepath + (section if section + "index.html" in titles else "")
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0">',
+        "<channel>",
+        f"  <title>{escape(channel_title)}</title>",
+        f"  <link>{escape(channel_link)}</link>",
+        f"  <description>{escape(channel_title)}</description>",
+    ]
+    if items:
+        lines.append(f"  <lastBuildDate>{format_datetime(timestamp(items[0][2]))}</lastBuildDate>")
+    for _, url, entry, _ in items:
+        link = escape(site_url + url)
+        lines.extend([
+            "  <item>",
+            f"    <title>{escape(entry['title'])}</title>",
+            f"    <link>{link}</link>",
+            f"    <guid>{link}</guid>",
+            f"    <pubDate>{format_datetime(timestamp(entry))}</pubDate>",
+            f"    <description>{escape(entry['summary'])}</description>",
+            "  </item>",
+        ])
+    lines.extend(["</channel>", "</rss>"])
+    return "\n".join(lines) + "\n"
+
+
+def tokenize(text):
+    return WORD_PATTERN.findall(text.lower())
+
+def common_prefix_length(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+def search_index(site, index):
+    '''
+    Build an inverted index over page titles and text from the postings
+    of index, a PageIndex over the same pages as site.
+
+    "docs" lists [url, title] per page. "terms" is sorted and front coded:
+    each term is [length of the prefix shared with the previous term,
+    rest of the term, page numbers], with the page numbers ascending and
+    stored as gaps from the previous one. See decode_search_index.
+    '''
+    doc_ids = {dest_path: doc_id for doc_id, (_, _, _, dest_path) in enumerate(site)}
+    terms = []
+    previous = ""
+    for term in sorted(index.postings):
+        gaps = index.gaps.get(term)
+        if gaps is None:
+            ids = sorted(doc_ids[dest_path] for dest_path in index.postings[term])
+            gaps = index.gaps[term] = [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+        shared = common_prefix_length(previous, term)
+        terms.append([shared, term[shared:], gaps])
+        previous = term
+
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "docs": [[url, entry["title"]] for _, url, entry, _ in site],
+        "terms": terms,
+    }
+
+def decode_search_index(index):
+    '''
+    Expand a search index back into {term: [doc ids]}
+    '''
+    postings = {}
+    previous = ""
+    for shared, rest, gaps in index["terms"]:
+        term = previous[:shared] + rest
+        doc_ids = []
+        doc_id = 0
+        for gap in gaps:
+            doc_id += gap
+            doc_ids.append(doc_id)
+        postings[term] = doc_ids
+        previous = term
+    return postings
+
+def search(index, query):
+    '''
+    Return the [url, title] of every page containing all words of query
+    '''
+    postings = decode_search_index(index)
+    matches = None
+    for term in tokenize(query):
+        doc_ids = set(postings.get(term, ()))
+        matches = doc_ids if matches is None else matches & doc_ids
+    return [index["docs"][doc_id] for doc_id in sorted(matches or ())]
+
+
+def artifacts(entries, public_dir, basepath, site_url):
+    '''
+    Render the sitemap, blog feed and search index for the recorded page
+    entries, given as {dest_path: entry} or as a PageIndex, which a caller
+    that keeps one between calls can update page by page. Returns
+    {path relative to public_dir: text}.
+    '''
+    index = entries if isinstance(entries, PageIndex) else PageIndex(entries)
+    site_url = site_url.rstrip("/")
+    site = site_pages(index.entries, public_dir, basepath)
+    return {
+        SITEMAP_PATH: sitemap_xml(site, site_url),
+        FEED_PATH: feed_xml(site, site_url, basepath),
+        SEARCH_INDEX_PATH: json.dumps(search_index(site, index), ensure_ascii=False, separators=(",", ":")),
+    }
@@ -0,0 +1,122 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from discovery import scan
+from manifest import hash_file
+
+
+def list_files(root):
+    '''
+    Return the paths of every file below root, relative to it, sorted,
+    ignoring nothing
+    '''
+    return scan(root, ignore=())
+
+def needs_copy(from_path, to_path, use_hash=False):
+    '''
+    A destination is up to date when its size and mtime match the source
+    (copies keep the source mtime), and with use_hash also its contents
+    '''
+    try:
+        dest = os.stat(to_path)
+    except FileNotFoundError:
+        return True
+    source = os.stat(from_path)
+    if source.st_size != dest.st_size or source.st_mtime_ns != dest.st_mtime_ns:
+        return True
+    if use_hash and not os.path.samefile(from_path, to_path):
+        return hash_file(from_path) != hash_file(to_path)
+    return False
+
+def _copy_data(source, dest):
+    # copy_file_range lets the kernel copy, or reflink, without the data
+    # passing through this process; fall back to a plain copy where the
+    # platform or filesystem does not support it
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is not None:
+        try:
+            while copy_file_range(source.fileno(), dest.fileno(), 1 << 30):
+                pass
+            return
+        except OSError:
+            source.seek(0)
+            dest.seek(0)
+            dest.truncate()
+    shutil.copyfileobj(source, dest)
+
+def copy_file(from_path, to_path, link=False):
+    '''
+    Copy from_path to to_path, or hardlink it when link is set and the
+    filesystem allows. Returns "link" or "copy".
+    '''
+    dest_dir_path = os.path.dirname(to_path)
+    if dest_dir_path != "":
+        os.makedirs(dest_dir_path, exist_ok=True)
+    # Never write through an old hardlink into the source tree
+    if os.path.lexists(to_path):
+        os.remove(to_path)
+
+    if link:
+        try:
+            os.link(from_path, to_path)
+            return "link"
+        except OSError:
+            pass
+
+    with open(from_path, "rb") as source, open(to_path, "wb") as dest:
+        _copy_data(source, dest)
+    shutil.copystat(from_path, to_path)
+    return "copy"
+
+def remove_orphans(orphans, destination_dir):
+    root = os.path.abspath(destination_dir)
+    for rel_path in orphans:
+        to_path = os.path.join(destination_dir, rel_path)
+        if os.path.isfile(to_path):
+            print(f"\t- {to_path}")
+            os.remove(to_path)
+
+        parent = os.path.dirname(os.path.abspath(to_path))
+        while parent != root and parent.startswith(root + os.sep):
+            if os.listdir(parent):
+                break
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+
+def sync_static(source_dir, destination_dir, previous=None, use_hash=False, link=False, jobs=None, files=None):
+    '''
+    Bring destination_dir in line with source_dir, copying only the files
+    whose size, mtime (or, with use_hash, contents) differ.
+
+    previous - The file list returned by the last sync into destination_dir.
+    Files in it that are gone from source_dir are deleted; files the
+    destination has from elsewhere (e.g. rendered pages) are never touched.
+    link - Hardlink files instead of copying where possible
+    jobs - Number of copy threads, None for the ThreadPoolExecutor default
+    files - The files to sync, relative to source_dir, as listed by
+    discovery; by default source_dir is scanned
+
+    Returns the list of synced files, relative to source_dir, to pass back
+    in as previous next time.
+    '''
+    if files is None:
+        files = scan(source_dir)
+    pending = []
+    for rel_path in files:
+        from_path = os.path.join(source_dir, rel_path)
+        to_path = os.path.join(destination_dir, rel_path)
+        if needs_copy(from_path, to_path, use_hash):
+            pending.append((from_path, to_path))
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        methods = pool.map(lambda paths: copy_file(paths[0], paths[1], link), pending)
+        for (from_path, to_path), method in zip(pending, methods):
+            print(f"\t* {from_path} -> {to_path} ({method})")
+
+    current = set(files)
+    orphans = sorted(rel_path for rel_path in previous or [] if rel_path not in current)
+    remove_orphans(orphans, destination_dir)
+
+    print(f"Static: copied {len(pending)}, unchanged {len(files) - len(pending)}, removed {len(orphans)}")
+    return files
@@ -0,0 +1,26 @@
+from collections import Counter
+
+# Build-wide event counters (cache hits, files written, ...). Worker
+# processes drain theirs after every page and the parent merges them.
+counters = Counter()
+
+
+def incr(name, amount=1):
+    counters[name] += amount
+
+def get(name):
+    return counters[name]
+
+def drain():
+    data = dict(counters)
+    counters.clear()
+    return data
+
+def merge(data):
+    counters.update(data)
+
+def reset():
+    counters.clear()
+
+def summary():
+    return ", ".join(f"{name}: {amount}" for name, amount in sorted(counters.items()))
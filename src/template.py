@@ -0,0 +1,179 @@
+import os
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (Title|Content) \}\}")
+ROOT_LINK_PATTERN = re.compile(r'(href|src)="/')
+# The same links, capturing the path up to any query or fragment
+ROOT_PATH_PATTERN = re.compile(r'(href|src)="/([^"?#]*)')
+
+# Comments, elements whose contents are kept verbatim, other tags, and text
+MINIFY_TOKEN_PATTERN = re.compile(
+    r"(<!--.*?-->)|(<(pre|textarea|script|style)\b.*?</\3\s*>)|(<[^>]*>)|([^<]+|<)",
+    re.DOTALL | re.IGNORECASE,
+)
+TAG_NAME_PATTERN = re.compile(r"</?([A-Za-z!][\w-]*)")
+SELF_CLOSING_PATTERN = re.compile(r"\s*/>$")
+WHITESPACE_PATTERN = re.compile(r"[ \t\n\r\f]+")
+
+# Whitespace next to these tags never renders, so the minifier drops it
+# instead of collapsing it to a space
+BLOCK_LEVEL_TAGS = frozenset((
+    "!doctype", "html", "head", "body", "title", "meta", "link", "base", "script", "style", "noscript",
+    "article", "aside", "section", "header", "footer", "nav", "main", "div", "p", "pre", "blockquote",
+    "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "dl", "dt", "dd", "figure", "figcaption",
+    "table", "thead", "tbody", "tfoot", "tr", "th", "td", "form", "fieldset", "hr", "br",
+))
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"))
+
+_template_cache = {}
+
+
+def rewrite_root_links(html, basepath, assets=None):
+    '''
+    Point root-relative href="/..." and src="/..." links at basepath in a
+    single scan
+
+    assets - Maps URL paths below the root to the ones to link to instead,
+    e.g. fingerprinted assets, {"index.css": "index.0123456789.css"}
+    '''
+    if '="/' not in html:
+        return html
+    if assets:
+        def replace(match):
+            path = match.group(2)
+            return match.group(1) + '="' + basepath + assets.get(path, path)
+        return ROOT_PATH_PATTERN.sub(replace, html)
+    if basepath == "/":
+        return html
+    return ROOT_LINK_PATTERN.sub(lambda match: match.group(1) + '="' + basepath, html)
+
+def tag_name(tag):
+    match = TAG_NAME_PATTERN.match(tag)
+    return match.group(1).lower() if match else None
+
+def minify_template(text):
+    '''
+    Drop comments and the whitespace around block-level tags, collapse
+    other runs of whitespace to one space and shorten self-closing void
+    tags, leaving <pre>, <textarea>, <script> and <style> as they are.
+    Placeholders are plain text here and come through intact.
+    '''
+    tokens = []
+    for comment, verbatim, _, tag, text_run in MINIFY_TOKEN_PATTERN.findall(text):
+        if comment:
+            # Conditional comments are instructions to old browsers
+            if comment.startswith("<!--[if"):
+                tokens.append(("tag", comment, None))
+        elif verbatim:
+            tokens.append(("tag", verbatim, tag_name(verbatim)))
+        elif tag:
+            name = tag_name(tag)
+            if name in VOID_TAGS:
+                tag = SELF_CLOSING_PATTERN.sub(">", tag)
+            tokens.append(("tag", tag, name))
+        elif tokens and tokens[-1][0] == "text":
+            # Text on both sides of a dropped comment
+            tokens[-1] = ("text", WHITESPACE_PATTERN.sub(" ", tokens[-1][1] + text_run), None)
+        else:
+            tokens.append(("text", WHITESPACE_PATTERN.sub(" ", text_run), None))
+
+    parts = []
+    for i, (kind, value, _) in enumerate(tokens):
+        if kind == "text":
+            before = tokens[i - 1] if i > 0 else None
+            after = tokens[i + 1] if i + 1 < len(tokens) else None
+            if before is None or before[2] in BLOCK_LEVEL_TAGS:
+                value = value.lstrip(" ")
+            if after is None or after[2] in BLOCK_LEVEL_TAGS:
+                value = value.rstrip(" ")
+        parts.append(value)
+    return "".join(parts)
+
+
+class Template():
+    def __init__(self, text, basepath="/", minify=False, assets=None):
+        '''
+        text - The raw template containing {{ Title }} and {{ Content }}
+        basepath - The prefix root-relative links are rewritten to
+        minify - Minify the template's own markup, see minify_template
+        assets - A fingerprint.AssetManifest; links to the assets it lists,
+        in the template and in rendered titles and content, are pointed at
+        the fingerprinted copies as basepath is applied
+
+        The template is split once into literal segments and placeholder
+        slots, with slots[i] sitting between segments[i] and segments[i+1].
+        The literal segments already have their links rewritten, so
+        rendering is a single join.
+
+        bytes_saved is how much smaller minifying made every rendered page.
+        '''
+        self.basepath = basepath
+        self.minify = minify
+        self.assets = assets
+        self.asset_names = assets.names if assets is not None else None
+        self.segments = []
+        self.slots = []
+        self.bytes_saved = 0
+        if minify:
+            minified = minify_template(text)
+            self.bytes_saved = len(text.encode("utf-8")) - len(minified.encode("utf-8"))
+            text = minified
+
+        pos = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self.segments.append(rewrite_root_links(text[pos:match.start()], basepath, self.asset_names))
+            self.slots.append(match.group(1))
+            pos = match.end()
+        self.segments.append(rewrite_root_links(text[pos:], basepath, self.asset_names))
+
+    def render(self, title, content):
+        values = {
+            "Title": rewrite_root_links(title, self.basepath, self.asset_names),
+            "Content": rewrite_root_links(content, self.basepath, self.asset_names),
+        }
+        parts = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            parts.append(values[slot])
+            parts.append(segment)
+        return "".join(parts)
+
+    def iter_render(self, title, content_chunks):
+        '''
+        Like render, but yields the page piece by piece. content_chunks is
+        any iterable of HTML strings, e.g. HTMLNode.iter_html(), and is
+        consumed lazily, once, by the first {{ Content }} slot.
+        '''
+        basepath, assets = self.basepath, self.asset_names
+        yield self.segments[0]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            if slot == "Title":
+                yield rewrite_root_links(title, basepath, assets)
+            else:
+                for chunk in content_chunks:
+                    yield rewrite_root_links(chunk, basepath, assets)
+            yield segment
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.slots}, {self.basepath}, minify={self.minify})"
+
+
+def load_template(template_path, basepath="/", minify=False, assets=None):
+    '''
+    Return the compiled template for template_path, reusing the cached one
+    for as long as the file's mtime and size are unchanged
+    '''
+    stat = os.stat(template_path)
+    key = (os.path.abspath(template_path), basepath, minify, assets.digest if assets is not None else None)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with open(template_path, "r") as f:
+        template = Template(f.read(), basepath, minify, assets)
+    _template_cache[key] = (stamp, template)
+    return template
+
+def clear_template_cache():
+    _template_cache.clear()
@@ -0,0 +1,74 @@
+import contextlib
+import io
+import os
+import unittest
+from unittest import mock
+
+import async_build
+import site_index
+from async_build import build_pages_with_asyncio
+from fixtures import TempDirTestCase
+from scheduler import PageBuildError
+
+
+class TestBuildPagesAsync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.path("template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.addCleanup(site_index.reset)
+        self.pages = []
+        for i in range(20):
+            from_path = self.path(f"page{i}.md")
+            self.write(from_path, f"# Page {i}\n\nBody {i}")
+            self.pages.append((from_path, self.path("out", f"page{i}.html")))
+
+    def run_build(self, jobs=1, **options):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+            try:
+                build_pages_with_asyncio(self.pages, self.template, "/", jobs, **options)
+            except PageBuildError as e:
+                return out.getvalue(), e
+        return out.getvalue(), None
+
+    def test_renders_every_page(self):
+        for jobs, options in ((1, {"concurrency": 3, "batch_size": 4}), (2, {"fsync": True})):
+            log, error = self.run_build(jobs, **options)
+            self.assertIsNone(error)
+            for i, (from_path, dest_path) in enumerate(self.pages):
+                self.assertIn(from_path, log)
+                with open(dest_path) as f:
+                    self.assertEqual(f.read(), f"<title>Page {i}</title><div><h1>Page {i}</h1><p>Body {i}</p></div>")
+
+    def test_failures_are_collected(self):
+        bad_path = self.pages[2][0]
+        missing_path = self.pages[7][0]
+        self.write(bad_path, "no heading here")
+        os.remove(missing_path)
+        _, error = self.run_build(concurrency=4)
+        self.assertIsInstance(error, PageBuildError)
+        self.assertEqual(sorted(path for path, _ in error.failures), sorted([bad_path, missing_path]))
+        self.assertTrue(os.path.isfile(self.pages[19][1]))
+
+    def test_bad_front_matter_fails_its_page(self):
+        # More pages than the queue holds, so a stuck writer would hang
+        for i in range(20, 80):
+            from_path = self.write(f"page{i}.md", f"# Page {i}")
+            self.pages.append((from_path, self.path("out", f"page{i}.html")))
+        bad_path = self.pages[5][0]
+        self.write(bad_path, "---\ndate: someday\n---\n# Page 5")
+        _, error = self.run_build(concurrency=8, batch_size=4)
+        self.assertEqual([path for path, _ in error.failures], [bad_path])
+        self.assertIn("FrontMatterError", error.failures[0][1])
+        self.assertTrue(os.path.isfile(self.pages[79][1]))
+        self.assertEqual(len(site_index.pages), 79)
+
+    def test_writer_error_stops_the_build(self):
+        with mock.patch.object(async_build, "write_batch", side_effect=RuntimeError("disk gone")):
+            with self.assertRaises(RuntimeError):
+                self.run_build(concurrency=8, batch_size=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
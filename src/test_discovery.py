@@ -0,0 +1,57 @@
+import os
+import unittest
+
+from discovery import IGNORE_PATTERNS, accepts, compile_ignore, discover, scan
+from fixtures import TempDirTestCase
+
+
+class TestDiscovery(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        for rel_path in (
+            "content/index.md",
+            "content/blog/b/index.md",
+            "content/blog/a.md",
+            "content/blog/notes.txt",
+            "content/blog/index.md~",
+            "content/drafts/wip.md",
+            "content/.git/HEAD.md",
+            "static/index.css",
+            "static/.nojekyll",
+            "static/images/.DS_Store",
+            "static/images/logo.png",
+        ):
+            self.touch(rel_path)
+
+    def touch(self, rel_path):
+        self.write(os.path.join(*rel_path.split("/")), "# Title")
+
+    def test_scan_walks_in_directory_order(self):
+        self.assertEqual(
+            scan(self.path("content"), suffixes=(".md",)),
+            [os.path.join("blog", "a.md"), os.path.join("blog", "b", "index.md"),
+             os.path.join("drafts", "wip.md"), "index.md"],
+        )
+        self.assertIn(os.path.join(".git", "HEAD.md"), scan(self.path("content"), ignore=()))
+
+    def test_discover_pages_and_assets(self):
+        site = discover(self.path("content"), self.path("static"), self.path("public"),
+                        IGNORE_PATTERNS + ("drafts/*",))
+        self.assertEqual(site.pages, [
+            (self.path("content", "blog", "a.md"), self.path("public", "blog", "a.html")),
+            (self.path("content", "blog", "b", "index.md"), self.path("public", "blog", "b", "index.html")),
+            (self.path("content", "index.md"), self.path("public", "index.html")),
+        ])
+        self.assertEqual(site.assets, [".nojekyll", os.path.join("images", "logo.png"), "index.css"])
+        self.assertIn(os.path.join("blog", "b", "index.html"), site.outputs(self.path("public")))
+
+    def test_accepts_checks_parent_directories(self):
+        matcher = compile_ignore(IGNORE_PATTERNS + ("drafts",))
+        self.assertTrue(accepts(matcher, os.path.join("blog", "a.md"), (".md",)))
+        self.assertFalse(accepts(matcher, os.path.join("blog", "notes.txt"), (".md",)))
+        self.assertFalse(accepts(matcher, os.path.join("drafts", "wip.md"), (".md",)))
+        self.assertFalse(accepts(matcher, os.path.join(".git", "HEAD.md")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+import fingerprint
+from fingerprint import ASSET_MANIFEST_PATH, AssetManifest, fingerprinted_name
+from fixtures import TempDirTestCase
+from template import Template
+
+
+class TestFingerprint(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = self.path("static")
+        self.public = self.path("public")
+        self.write("index.css", "body { margin: 0 }")
+        self.write(os.path.join("images", "tom.png"), "png")
+        self.write("robots.txt", "User-agent: *")
+
+    def write(self, rel_path, text):
+        return super().write(os.path.join(self.static, rel_path), text)
+
+    def fingerprint(self):
+        files = ["index.css", os.path.join("images", "tom.png"), "robots.txt"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fingerprint.fingerprint_static(self.static, self.public, files)
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("images/tom.png", "0123456789abcdef"), "images/tom.0123456789.png")
+        self.assertEqual(fingerprinted_name("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+
+    def test_fingerprint_static(self):
+        assets = self.fingerprint()
+        self.assertEqual(sorted(assets.names), ["images/tom.png", "index.css"])
+        css = assets.names["index.css"]
+        self.assertRegex(css, r"^index\.[0-9a-f]{10}\.css$")
+        with open(os.path.join(self.public, css)) as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+        with open(os.path.join(self.public, ASSET_MANIFEST_PATH)) as f:
+            self.assertEqual(json.load(f), assets.names)
+        self.assertEqual(self.fingerprint().digest, assets.digest)
+
+        self.write("index.css", "body { margin: 1em }")
+        changed = self.fingerprint()
+        self.assertNotEqual(changed.names["index.css"], css)
+        self.assertNotEqual(changed.digest, assets.digest)
+        self.assertFalse(os.path.exists(os.path.join(self.public, css)))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "images", os.path.basename(assets.names["images/tom.png"]))))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            fingerprint.remove_fingerprints(self.public)
+        self.assertEqual(os.listdir(self.public), [])
+
+    def test_template_links_to_fingerprinted_assets(self):
+        assets = AssetManifest({"index.css": "index.abc.css", "images/tom.png": "images/tom.abc.png"})
+        template = Template('<link href="/index.css"><a href="/blog">{{ Title }}</a>{{ Content }}', "/site/", assets=assets)
+        self.assertEqual(
+            template.render("t", '<img src="/images/tom.png"><img src="/images/tom.png?v=1"><a href="https://x.dev/index.css">x</a>'),
+            '<link href="/site/index.abc.css"><a href="/site/blog">t</a>'
+            '<img src="/site/images/tom.abc.png"><img src="/site/images/tom.abc.png?v=1">'
+            '<a href="https://x.dev/index.css">x</a>',
+        )
+        self.assertEqual(
+            "".join(template.iter_render("t", ['<img src="/images/tom.png">'])),
+            '<link href="/site/index.abc.css"><a href="/site/blog">t</a><img src="/site/images/tom.abc.png">',
+        )
+        self.assertEqual(Template('<link href="/index.css">', assets=assets).segments, ['<link href="/index.abc.css">'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+import site_index
+import textnode
+from fixtures import TempDirTestCase
+from front_matter import (
+    FrontMatterError,
+    as_list,
+    parse_date,
+    scan_metadata,
+    scan_pages,
+    split_front_matter,
+)
+
+PAGE = """---
+title: "Why Tom Bombadil Was a Mistake"
+Date: 2024-03-01
+# Shown on the blog index
+tags: tolkien,  characters
+
+description: An unpopular opinion
+---
+# Tom Bombadil
+
+Old Tom Bombadil is a merry fellow.
+"""
+
+
+class TestFrontMatter(TempDirTestCase):
+    def test_split_front_matter(self):
+        metadata, body = split_front_matter(textnode.iter_lines(PAGE))
+        self.assertEqual(metadata, {
+            "title": "Why Tom Bombadil Was a Mistake",
+            "date": "2024-03-01",
+            "tags": "tolkien,  characters",
+            "description": "An unpopular opinion",
+        })
+        self.assertEqual(next(body), "# Tom Bombadil")
+        self.assertEqual(as_list(metadata["tags"]), ["tolkien", "characters"])
+
+    def test_without_front_matter(self):
+        metadata, body = split_front_matter(["# Title\n", "text\n"])
+        self.assertEqual(metadata, {})
+        self.assertEqual(list(body), ["# Title\n", "text\n"])
+        self.assertEqual(split_front_matter([])[0], {})
+
+    def test_invalid_front_matter(self):
+        with self.assertRaises(FrontMatterError):
+            split_front_matter(["---", "title: x", "# Title"])
+        with self.assertRaisesRegex(FrontMatterError, "line 2"):
+            split_front_matter(["---", "no separator", "---"])
+        with self.assertRaises(FrontMatterError):
+            parse_date("March 1st")
+
+    def test_parse_date(self):
+        self.assertEqual(parse_date("1970-01-02"), 86400)
+        self.assertEqual(parse_date("1970-01-01T01:00:00+01:00"), 0)
+
+    def test_scan_metadata_reads_only_the_header(self):
+        body = "x" * 100 + "\n"
+        path = self.write("page.md", PAGE + body * 1000)
+        self.assertEqual(scan_metadata(path)["title"], "Why Tom Bombadil Was a Mistake")
+
+        path = self.write("plain.md", "Intro\n\n# Heading\n" + body * 1000)
+        self.assertEqual(scan_metadata(path), {"title": "Heading"})
+        path = self.write("late.md", body * 1000 + "# Too late\n")
+        self.assertEqual(scan_metadata(path, max_chars=1000), {"title": None})
+
+        pages = [(self.path(name), None) for name in ("plain.md", "page.md")]
+        self.assertEqual(list(scan_pages(pages, jobs=2)), [path for path, _ in pages])
+
+    def test_rendering_skips_front_matter(self):
+        title, content, text, metadata = textnode.content_from_markdown(PAGE)
+        self.assertEqual(title, "Why Tom Bombadil Was a Mistake")
+        self.assertEqual(content, "<div><h1>Tom Bombadil</h1><p>Old Tom Bombadil is a merry fellow.</p></div>")
+        self.assertEqual(metadata["date"], "2024-03-01")
+        self.assertEqual(textnode.extract_title("---\ntitle: Only\n---\ntext"), "Only")
+
+    def test_rendering_rejects_bad_date(self):
+        with self.assertRaises(FrontMatterError):
+            textnode.content_from_markdown("---\ndate: someday\n---\n# Title")
+
+    def test_site_index_entry(self):
+        title, _, text, metadata = textnode.content_from_markdown(PAGE)
+        # Dated by the front matter the parse returned, without reading the file
+        entry = site_index.page_entry(self.path("missing.md"), title, text, metadata)
+        self.assertEqual(entry["mtime"], int(parse_date("2024-03-01")))
+        self.assertEqual(entry["summary"], "An unpopular opinion")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, ParentNode
+from htmlnode import HTMLNode, Minifier, ParentNode
 from leafnode import LeafNode
 
 
@@ -128,5 +129,65 @@ class TestHTMLNode(unittest.TestCase):
             "<h2><b>Bold text</b>Normal text<i>italic text</i>Normal text</h2>",
         )
 
+    def test_slots(self):
+        for node in [HTMLNode("p", "x"), ParentNode("div", []), LeafNode("b", "x")]:
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")]),
+                LeafNode("a", "link", {"href": "/blog"}),
+            ],
+            {"class": "page"},
+        )
+        chunks = list(node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), node.to_html())
+
+    def test_write_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "item")])])
+        fp = io.StringIO()
+        node.write_html(fp)
+        self.assertEqual(fp.getvalue(), "<ul><li>item</li></ul>")
+
+    def test_iter_html_invalid(self):
+        with self.assertRaises(ValueError):
+            list(ParentNode(None, [LeafNode(None, "x")]).iter_html())
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("p", None)]).to_html()
+
+    def test_text_content(self):
+        node = ParentNode("div", [
+            ParentNode("h1", [LeafNode(None, "Title")]),
+            ParentNode("p", [LeafNode(None, "Some "), LeafNode("b", "bold"), LeafNode("img", "", props={"src": "x.png"})]),
+            ParentNode("ul", [ParentNode("li", [LeafNode(None, "one")]), ParentNode("li", [LeafNode(None, "two")])]),
+        ])
+        self.assertEqual(node.text_content(), "Title\nSome bold\none\ntwo")
+
+    def test_minified_html(self):
+        code = "def f():\n    return  1\n"
+        node = ParentNode("div", [
+            ParentNode("p", [
+                LeafNode(None, "Some   spaced\n text "),
+                LeafNode("b", "bold  words"),
+                LeafNode("code", "a  b"),
+                LeafNode(None, "\u00a0\u00a0kept"),
+            ]),
+            ParentNode("p", [LeafNode("img", "", props={"src": "x.png", "alt": "an  image"})]),
+            ParentNode("pre", [ParentNode("code", [LeafNode(None, code)])]),
+        ])
+        minifier = Minifier()
+        html = node.to_html(minifier)
+        self.assertEqual(
+            html,
+            "<div><p>Some spaced text <b>bold words</b><code>a  b</code>\u00a0\u00a0kept</p>"
+            '<p><img src="x.png" alt="an  image"></p>'
+            f"<pre><code>{code}</code></pre></div>",
+        )
+        self.assertEqual(minifier.saved, len(node.to_html()) - len(html))
+        self.assertEqual("".join(node.iter_html(Minifier())), html)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
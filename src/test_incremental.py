@@ -0,0 +1,92 @@
+import contextlib
+import io
+import os
+import unittest
+from unittest import mock
+
+import textnode
+from fixtures import TempDirTestCase
+from incremental import generate_pages_incremental
+from manifest import manifest_path_for
+
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+class TestIncrementalBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.path("content")
+        self.public = self.path("public")
+        self.template = self.path("template.html")
+        self.manifest = self.path("manifest.json")
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nHello")
+
+    def build(self, basepath="/"):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_pages_incremental(
+                self.content, self.template, self.public, basepath, self.manifest
+            )
+
+    def test_output_directories_keep_separate_manifests(self):
+        other = self.path("other")
+        self.assertEqual(manifest_path_for(self.public + os.sep), self.path(".public.build-manifest.json"))
+        self.assertNotEqual(manifest_path_for(other), manifest_path_for(self.public))
+        for public in (self.public, other, other):
+            with contextlib.redirect_stdout(io.StringIO()):
+                counts = generate_pages_incremental(
+                    self.content, self.template, public, "/", manifest_path_for(public)
+                )
+        # Building into other again neither re-renders nor prunes public
+        self.assertEqual(counts, (0, 2, 0))
+        self.assertTrue(os.path.isfile(os.path.join(self.public, "index.html")))
+
+    def test_first_build_renders_everything(self):
+        self.assertEqual(self.build(), (2, 0, 0))
+        self.assertTrue(os.path.isfile(os.path.join(self.public, "index.html")))
+        self.assertTrue(os.path.isfile(os.path.join(self.public, "blog", "post", "index.html")))
+
+    def test_unchanged_build_skips(self):
+        self.build()
+        self.assertEqual(self.build(), (0, 2, 0))
+
+    def test_only_changed_page_rerendered(self):
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        self.assertEqual(self.build(), (1, 1, 0))
+        with open(os.path.join(self.public, "index.html")) as f:
+            self.assertIn("Changed", f.read())
+
+    def test_template_and_basepath_invalidate(self):
+        self.build()
+        self.write(self.template, TEMPLATE + "\n")
+        self.assertEqual(self.build(), (2, 0, 0))
+        self.assertEqual(self.build("/site/"), (2, 0, 0))
+
+    def test_parser_version_and_minify_invalidate(self):
+        self.build()
+        with mock.patch.object(textnode, "PARSER_VERSION", textnode.PARSER_VERSION + 1):
+            self.assertEqual(self.build(), (2, 0, 0))
+        self.build()
+        textnode.set_minify(True)
+        try:
+            self.assertEqual(self.build(), (2, 0, 0))
+        finally:
+            textnode.set_minify(False)
+
+    def test_missing_output_rerendered(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.html"))
+        self.assertEqual(self.build(), (1, 1, 0))
+
+    def test_deleted_source_pruned(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        self.assertEqual(self.build(), (0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+        self.assertTrue(os.path.isfile(os.path.join(self.public, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import io
+import timeit
 import unittest
 from textnode import (
     BlockType,
@@ -5,12 +7,19 @@ from textnode import (
     split_nodes_delimiter,
     split_nodes_image,
     split_nodes_link,
+    split_nodes_images_and_links,
     text_to_textnodes,
+    text_to_textnodes_pipeline,
+    tokenize_inline,
     extract_markdown_images,
     extract_markdown_links,
+    extract_markdown_images_and_links,
     markdown_to_blocks,
+    iter_markdown_blocks,
     markdown_to_html_node,
     extract_title,
+    InlineMemo,
+    text_to_children,
 )
 
 from textnode import TextNode, TextType
@@ -113,6 +122,13 @@ class TestInlineMarkdown(unittest.TestCase):
             matches,
         )
 
+    def test_extract_markdown_images_and_links(self):
+        text = "[link](/a) and ![image](/b.png) and [![linked](/c.png)](/d) and [another](/e)"
+        self.assertEqual(
+            extract_markdown_images_and_links(text),
+            (extract_markdown_images(text), extract_markdown_links(text)),
+        )
+
     def test_split_image(self):
         node = TextNode(
             "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png)",
@@ -175,6 +191,17 @@ class TestInlineMarkdown(unittest.TestCase):
             new_nodes,
         )
 
+    def test_split_images_and_links_in_one_pass(self):
+        for text in (
+            "[link](/a) and ![image](/b.png) and [![linked](/c.png)](/d) and [another](/e)",
+            # Images are split out before links, even from a link's url
+            "[a](![b](c)",
+            "![a](b![c](d)",
+            "![a](b(c)[d](e)",
+        ):
+            nodes = [TextNode(text, TextType.TEXT)]
+            self.assertListEqual(split_nodes_images_and_links(nodes), split_nodes_link(split_nodes_image(nodes)))
+
     def test_text_to_textnodes(self):
         nodes = text_to_textnodes(
             "This is **text** with an _italic_ word and a `code block` and an ![image](https://i.imgur.com/zjjcJKZ.png) and a [link](https://boot.dev)"
@@ -195,6 +222,57 @@ class TestInlineMarkdown(unittest.TestCase):
             nodes,
         )
 
+    def test_tokenizer_matches_pipeline(self):
+        texts = [
+            "",
+            "plain text only",
+            "This is **text** with an _italic_ word and a `code block` and an ![image](https://i.imgur.com/zjjcJKZ.png) and a [link](https://boot.dev)",
+            "**bold** at the start and _italic_ at the end_ _",
+            "***a***",
+            "[link](/a)[another](/b)![img](/c.png)trailing",
+            "![](/empty-alt.png) and [](/empty-text)",
+            "[![linked image](/a.png)](/b)",
+            "not [a link] and not (a link) and ![not] an image",
+            "**bold [link](/inside) stays bold**",
+        ]
+        for text in texts:
+            self.assertListEqual(text_to_textnodes_pipeline(text), tokenize_inline(text), text)
+
+    def test_tokenizer_unclosed(self):
+        for text in ["an **unclosed bold", "an _unclosed italic", "a `dangling code"]:
+            with self.assertRaises(ValueError):
+                tokenize_inline(text)
+
+    def test_tokenizer_first_span_wins(self):
+        self.assertListEqual(
+            [
+                TextNode("call ", TextType.TEXT),
+                TextNode("snake_case", TextType.CODE),
+                TextNode(" via ", TextType.TEXT),
+                TextNode("the_docs", TextType.LINK, "https://x.dev/a_b"),
+            ],
+            tokenize_inline("call `snake_case` via [the_docs](https://x.dev/a_b)"),
+        )
+
+    def test_inline_memo(self):
+        memo = InlineMemo(max_entries=2)
+        calls = []
+        def build(text):
+            calls.append(text)
+            return text_to_children(text)
+
+        first = memo.lookup("a **b**", build)
+        second = memo.lookup("a **b**", build)
+        self.assertEqual(calls, ["a **b**"])
+        self.assertEqual([n.to_html() for n in first], [n.to_html() for n in second])
+        self.assertIsNot(first, second)
+
+        memo.lookup("c", build)
+        memo.lookup("d", build)
+        self.assertEqual(list(memo.entries), ["c", "d"])
+        memo.lookup("x" * 2000, build)
+        self.assertNotIn("x" * 2000, memo.entries)
+
     def test_markdown_to_blocks(slef):
         md = """
 # This is a heading
@@ -251,6 +329,37 @@ This is the same paragraph on a new line
             ],
         )
 
+    def test_markdown_to_blocks_fenced_code(self):
+        md = """
+Intro paragraph
+
+```
+first line
+
+after a blank line
+```
+
+Outro
+"""
+        self.assertEqual(
+            markdown_to_blocks(md),
+            [
+                "Intro paragraph",
+                "```\nfirst line\n\nafter a blank line\n```",
+                "Outro",
+            ],
+        )
+
+    def test_iter_markdown_blocks_is_lazy(self):
+        def lines():
+            yield "# Title\n"
+            yield "\n"
+            yield "Body\n"
+            raise AssertionError("read past the requested block")
+
+        blocks = iter_markdown_blocks(lines())
+        self.assertEqual(next(blocks), "# Title")
+
     def test_block_to_block_type(self):
         md = """
 # This is a heading
@@ -282,6 +391,14 @@ This is a paragraph of text. It has some **bold** and _italic_ words inside of i
         self.assertEqual(block_to_block_type(block), BlockType.ORDEREDLIST)
         block = "paragraph"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+        block = "I think, therefore I am"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+        block = "12. twelfth"
+        self.assertEqual(block_to_block_type(block), BlockType.ORDEREDLIST)
+        block = "```python\ncode\n```"
+        self.assertEqual(block_to_block_type(block), BlockType.CODE)
+        block = "```inline``` code"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
 
     def test_md_to_html_paragraphs(self):
@@ -321,5 +438,39 @@ the **same** even with inline stuff
         expected = "This is a title"
         self.assertEqual(actual, expected)
 
+    def test_md_to_html_codeblock_info_string(self):
+        md = "```python\nx = a_b\n\ny = 1\n```\n\n```python inline```"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code>x = a_b\n\ny = 1\n</code></pre><p><code>python inline</code></p></div>",
+        )
+
+    def test_md_to_html_from_lines(self):
+        md = "# Title\n\n```\ncode\n\nmore code\n```\n"
+        node = markdown_to_html_node(io.StringIO(md))
+        self.assertEqual(
+            node.to_html(),
+            "<div><h1>Title</h1><pre><code>code\n\nmore code\n</code></pre></div>",
+        )
+
+class TestParserMicroBenchmarks(unittest.TestCase):
+    def best_of(self, func, number=20, repeat=5):
+        return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+    def test_block_type_reads_only_prefix(self):
+        short_block = "- item\n- item"
+        long_block = "- item\n" * 200_000
+        short = self.best_of(lambda: block_to_block_type(short_block))
+        long = self.best_of(lambda: block_to_block_type(long_block))
+        # Splitting the whole block would make this ~100000x slower
+        self.assertLess(long, short * 20 + 1e-5)
+
+    def test_fused_extraction_single_scan(self):
+        text = "see [link](/blog/post) and ![image](/images/a.png) " * 2000
+        separate = self.best_of(lambda: (extract_markdown_images(text), extract_markdown_links(text)))
+        fused = self.best_of(lambda: extract_markdown_images_and_links(text))
+        self.assertLess(fused, separate * 1.25)
+
+
 if __name__ == "__main__":
     unittest.main()
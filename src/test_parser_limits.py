@@ -0,0 +1,125 @@
+import random
+import time
+import timeit
+import unittest
+from unittest import mock
+
+import stats
+import textnode
+from textnode import ParseLimitError, markdown_to_html_node, set_inline_engine, set_parse_limits, text_to_textnodes
+
+
+class TestParseLimits(unittest.TestCase):
+    def setUp(self):
+        stats.reset()
+        textnode.inline_memo.clear()
+
+    def tearDown(self):
+        set_parse_limits()
+        stats.reset()
+
+    def test_input_size(self):
+        set_parse_limits(max_input_size=100)
+        markdown_to_html_node("a" * 100)
+        with self.assertRaises(ParseLimitError):
+            markdown_to_html_node("a" * 101)
+
+    def test_deep_nesting_falls_back_to_plain_text(self):
+        set_parse_limits(max_nesting=8)
+        nested = "[" * 9 + "x](/a)" + "]" * 8
+        node = markdown_to_html_node(f"{nested}\n\n[fine](/b)")
+        self.assertEqual(node.to_html(), f'<div><p>{nested}</p><p><a href="/b">fine</a></p></div>')
+        self.assertEqual(stats.get("parse_fallbacks"), 1)
+
+    def test_flat_links_skip_the_depth_walk(self):
+        set_parse_limits(max_nesting=8)
+        flat = " ".join(f"[link {i}](/{i})" for i in range(20))
+        with mock.patch.object(textnode, "nesting_depth", wraps=textnode.nesting_depth) as walk:
+            markdown_to_html_node(flat)
+            walk.assert_not_called()
+            markdown_to_html_node(flat + " [a [b] c](/x)")
+            walk.assert_called_once()
+        self.assertEqual(stats.get("parse_fallbacks"), 0)
+
+    def test_node_budget(self):
+        set_parse_limits(max_nodes=3)
+        node = markdown_to_html_node("**a** b\n\n**c** d\n\n**e** f")
+        self.assertEqual(node.to_html(), "<div><p><b>a</b> b</p><p><b>c</b> d</p><p>**e** f</p></div>")
+        # The budget is per document
+        node = markdown_to_html_node("**a** b")
+        self.assertEqual(node.to_html(), "<div><p><b>a</b> b</p></div>")
+
+    def test_timeout(self):
+        set_parse_limits(max_seconds=0)
+        node = markdown_to_html_node("# **Title**\n\n- _item_")
+        self.assertEqual(node.to_html(), "<div><h1>**Title**</h1><ul><li>_item_</li></ul></div>")
+
+    def test_limits_off(self):
+        set_parse_limits(max_input_size=None, max_nodes=None, max_nesting=None, max_seconds=None)
+        nested = "[" * 100 + "x" + "]" * 100
+        self.assertEqual(markdown_to_html_node(nested).to_html(), f"<div><p>{nested}</p></div>")
+        self.assertEqual(stats.get("parse_fallbacks"), 0)
+
+
+# Repeated units that used to trip up the inline engines: unbalanced and
+# nested brackets, empty links, and runs of delimiters
+PATHOLOGICAL_UNITS = [
+    ")]\n[](",
+    "[a](",
+    "![",
+    "[" * 3 + "a" + "]" * 3,
+    "_![***_![]",
+    "[a](b) ",
+    "**a** _b_ `c` ",
+    "](",
+]
+
+class TestParserStress(unittest.TestCase):
+    def tearDown(self):
+        set_inline_engine("tokenizer")
+
+    def parse_time(self, func, text):
+        def run():
+            try:
+                func(text)
+            except ValueError:
+                pass
+        return min(timeit.repeat(run, number=1, repeat=3))
+
+    def test_inline_engines_scale_linearly(self):
+        for engine in ("tokenizer", "pipeline"):
+            set_inline_engine(engine)
+            for unit in PATHOLOGICAL_UNITS:
+                small = self.parse_time(text_to_textnodes, unit * 2000)
+                large = self.parse_time(text_to_textnodes, unit * 8000)
+                # 4x the input; quadratic behaviour would take ~16x as long
+                self.assertLess(large, small * 9 + 0.01, f"{engine}: {unit!r}")
+                self.assertLess(large, 2.0, f"{engine}: {unit!r}")
+
+    def test_documents_scale_linearly(self):
+        for unit in ["> a\n", "- [a](b)\n", "1. _a_\n", "#" * 7 + " x\n\n", "[" * 40 + "\n\n"]:
+            small = self.parse_time(markdown_to_html_node, unit * 2500)
+            large = self.parse_time(markdown_to_html_node, unit * 10000)
+            self.assertLess(large, small * 9 + 0.01, repr(unit))
+            self.assertLess(large, 2.0, repr(unit))
+
+    def test_fuzz(self):
+        alphabet = ["[", "]", "(", ")", "!", "*", "**", "_", "`", "```", "#", "> ", "- ", "1. ",
+                    "a", "word", " ", "\n", "\n\n"]
+        rng = random.Random(19)
+        for engine in ("tokenizer", "pipeline"):
+            set_inline_engine(engine)
+            for _ in range(200):
+                text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 2000)))
+                start = time.perf_counter()
+                for func in (text_to_textnodes, markdown_to_html_node):
+                    try:
+                        func(text)
+                    except ValueError:
+                        # Malformed markdown is reported, never anything else
+                        pass
+                self.assertLess(time.perf_counter() - start, 0.5, repr(text[:80]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import contextlib
+import gzip
+import io
+import os
+import unittest
+
+import precompress
+from fixtures import TempDirTestCase
+
+
+class TestPrecompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.public = self.path()
+
+    def run_precompress(self, outputs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return precompress.precompress_outputs(self.public, outputs, jobs=2)
+
+    def test_gzip_bytes_is_deterministic(self):
+        data = b"<p>hello</p>" * 100
+        self.assertEqual(precompress.gzip_bytes(data), precompress.gzip_bytes(data))
+        self.assertEqual(gzip.decompress(precompress.gzip_bytes(data)), data)
+
+    def test_should_compress(self):
+        self.assertTrue(precompress.should_compress("index.html", 1000))
+        self.assertFalse(precompress.should_compress("index.html", 100))
+        self.assertFalse(precompress.should_compress("images/tolkien.PNG", 100000))
+        self.assertFalse(precompress.should_compress("archive.tar.gz", 100000))
+
+    def test_writes_siblings_with_source_mtime(self):
+        page = self.write("blog/index.html", b"<p>post</p>" * 100)
+        self.write("small.css", b"body{}")
+        self.write("image.png", b"\x89PNG" * 1000)
+
+        archives = self.run_precompress(["blog/index.html", "small.css", "image.png"])
+        self.assertEqual(archives, {os.path.join("blog", "index.html.gz")})
+        with open(page + ".gz", "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), b"<p>post</p>" * 100)
+        self.assertEqual(os.stat(page + ".gz").st_mtime_ns, os.stat(page).st_mtime_ns)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "image.png.gz")))
+
+    def test_recompresses_only_changed_outputs(self):
+        page = self.write("index.html", b"<p>one</p>" * 100)
+        self.assertEqual(precompress.compress_file(page), "written")
+        self.assertEqual(precompress.compress_file(page), "unchanged")
+
+        self.write("index.html", b"<p>two</p>" * 100)
+        os.utime(page, (1_000_000, 1_000_000))
+        self.assertEqual(precompress.compress_file(page), "written")
+        with open(page + ".gz", "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), b"<p>two</p>" * 100)
+
+    def test_removes_orphaned_archives(self):
+        self.write("gone.html.gz", b"stale")
+        self.write("shrunk.html.gz", b"stale")
+        self.write("shrunk.html", b"tiny")
+        self.write("static.tar.gz", b"a real asset")
+
+        self.assertEqual(self.run_precompress(["shrunk.html", "static.tar.gz", "missing.html"]), set())
+        self.assertEqual(sorted(os.listdir(self.public)), ["shrunk.html", "static.tar.gz"])
+
+    def test_remove_archives(self):
+        self.write("index.html.gz", b"stale")
+        self.write("blog/index.html.gz", b"stale")
+        self.write("static.tar.gz", b"a real asset")
+        self.assertEqual(sorted(precompress.remove_archives(self.public, ["static.tar.gz"])),
+                         [os.path.join("blog", "index.html.gz"), "index.html.gz"])
+        self.assertTrue(os.path.isfile(os.path.join(self.public, "static.tar.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.html.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
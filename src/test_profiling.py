@@ -0,0 +1,80 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import profiling
+from async_build import build_pages_with_asyncio
+import textnode
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        # Fragments remembered by earlier tests would skip inline parsing
+        textnode.inline_memo.clear()
+
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_leaves_functions_untouched(self):
+        original = textnode.markdown_to_html_node
+        profiling.enable()
+        self.assertIsNot(textnode.markdown_to_html_node, original)
+        profiling.disable()
+        self.assertIs(textnode.markdown_to_html_node, original)
+        self.assertFalse(profiling.is_enabled())
+
+    def test_page_phases_and_counts(self):
+        profiler = profiling.enable()
+        with tempfile.TemporaryDirectory() as tmp:
+            from_path = os.path.join(tmp, "index.md")
+            template_path = os.path.join(tmp, "template.html")
+            with open(from_path, "w") as f:
+                f.write("# Title\n\nSome **bold** text\n\n- one\n- two")
+            with open(template_path, "w") as f:
+                f.write("{{ Title }}{{ Content }}")
+            with contextlib.redirect_stdout(io.StringIO()):
+                textnode.generate_page(from_path, template_path, os.path.join(tmp, "index.html"), "/")
+
+        data = profiler.to_dict()
+        self.assertEqual(data["phases"]["markdown parse"]["calls"], 1)
+        self.assertEqual(data["phases"]["inline parse"]["calls"], 4)
+        self.assertEqual(data["phases"]["write"]["calls"], 1)
+        self.assertEqual(len(data["pages"]), 1)
+        self.assertEqual(data["pages"][0]["html_nodes"], data["counters"]["html_nodes"])
+        self.assertEqual(data["counters"]["text_nodes"], 6)
+        self.assertIn("markdown parse", profiler.summary())
+
+    def test_async_build_records_pages(self):
+        profiler = profiling.enable()
+        with tempfile.TemporaryDirectory() as tmp:
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w") as f:
+                f.write("{{ Title }}{{ Content }}")
+            pages = []
+            for name in ("a", "b"):
+                from_path = os.path.join(tmp, name + ".md")
+                with open(from_path, "w") as f:
+                    f.write(f"# {name}\n\ntext")
+                pages.append((from_path, os.path.join(tmp, name + ".html")))
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_pages_with_asyncio(pages, template_path, "/")
+
+        self.assertEqual(sorted(page["path"] for page in profiler.to_dict()["pages"]), [path for path, _ in pages])
+        self.assertNotIn("static copy", profiler.phases)
+
+    def test_drain_and_merge(self):
+        profiling.enable()
+        textnode.text_to_textnodes("some `code`")
+        data = profiling.drain()
+        profiler = profiling.get_profiler()
+        self.assertEqual(profiler.counters["text_nodes"], 0)
+        profiler.merge(data)
+        profiler.merge(data)
+        self.assertEqual(profiler.phases["inline parse"][0], 2)
+        self.assertEqual(profiler.counters["text_nodes"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import render
+import textnode
+from scheduler import PageBuildError
+from template import Template
+
+TEMPLATE = '<title>{{ Title }}</title><a href="/">home</a>{{ Content }}'
+
+
+class TestRenderAPI(unittest.TestCase):
+    def test_render_page(self):
+        html = render.render_page("# Hello\n\n[post](/blog/post)", TEMPLATE, "/site/")
+        self.assertEqual(
+            html,
+            '<title>Hello</title><a href="/site/">home</a>'
+            '<div><h1>Hello</h1><p><a href="/site/blog/post">post</a></p></div>',
+        )
+        self.assertEqual(render.render_page("# Hello\n\n[post](/blog/post)".encode(), TEMPLATE, "/site/"), html)
+        self.assertEqual("".join(render.iter_render_page("# Hello\n\n[post](/blog/post)", TEMPLATE, "/site/")), html)
+
+    def test_render_site_is_lazy_and_quiet(self):
+        consumed = []
+
+        def pages():
+            for i in range(3):
+                consumed.append(i)
+                yield f"blog/post{i}/index.md", f"# Post {i}\n\nBody"
+
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(out):
+            rendered = render.render_site(pages(), Template(TEMPLATE))
+            first = next(rendered)
+            self.assertEqual(consumed, [0])
+            rest = list(rendered)
+            self.assertEqual(os.listdir(tmp), [])
+
+        self.assertEqual(out.getvalue(), "")
+        self.assertEqual(first.path, os.path.join("blog", "post0", "index.html"))
+        self.assertEqual(first.title, "Post 0")
+        self.assertEqual(first.text, "Post 0\nBody")
+        self.assertEqual([page.title for page in rest], ["Post 1", "Post 2"])
+
+    def test_render_site_reports_failing_path(self):
+        with self.assertRaises(PageBuildError) as cm:
+            list(render.render_site([("ok.md", "# Fine"), ("bad.md", "no heading")], TEMPLATE))
+        self.assertEqual([path for path, _ in cm.exception.failures], ["bad.md"])
+
+    def test_matches_file_build(self):
+        markdown = "# Home\n\n> quote\n\n- [a](/a)\n- ![b](/b.png)\n\n```\ncode\n```"
+        with tempfile.TemporaryDirectory() as tmp:
+            from_path = os.path.join(tmp, "index.md")
+            template_path = os.path.join(tmp, "template.html")
+            dest_path = os.path.join(tmp, "index.html")
+            for path, text in ((from_path, markdown), (template_path, TEMPLATE)):
+                with open(path, "w") as f:
+                    f.write(text)
+            shared = mock.patch.object(textnode, "content_from_lines", wraps=textnode.content_from_lines)
+            with shared as content_from_lines:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    textnode.generate_page(from_path, template_path, dest_path, "/site/")
+                # The file is streamed to the parser, not read into a string
+                content_from_lines.assert_called_once()
+                self.assertNotIsInstance(content_from_lines.call_args.args[0], str)
+                rendered = render.render_page(markdown, TEMPLATE, "/site/")
+                self.assertEqual(content_from_lines.call_count, 2)
+            with open(dest_path) as f:
+                built = f.read()
+        self.assertEqual(rendered, built)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import time
+import unittest
+
+import render_cache
+import stats
+import textnode
+from fixtures import TempDirTestCase
+from render_cache import RenderCache
+
+
+class TestRenderCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = RenderCache(self.path("cache"))
+
+    def tearDown(self):
+        render_cache.disable()
+        stats.reset()
+
+    def test_get_put(self):
+        key = self.cache.key(b"# Title", "1")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, "Title", "<div></div>", "Title", {"date": "2024-03-01"})
+        self.assertEqual(self.cache.get(key), ("Title", "<div></div>", "Title", {"date": "2024-03-01"}))
+
+    def test_key_includes_version(self):
+        self.assertNotEqual(self.cache.key(b"# Title", "1"), self.cache.key(b"# Title", "2"))
+        self.assertNotEqual(self.cache.key(b"# Title", "1"), self.cache.key(b"# Other", "1"))
+
+    def test_prune_evicts_least_recently_used(self):
+        keys = [self.cache.key(str(i).encode(), "1") for i in range(3)]
+        now = time.time()
+        for age, key in zip([30, 20, 10], keys):
+            self.cache.put(key, "t", "x" * 100)
+            os.utime(self.cache.path(key), (now - age, now - age))
+        # Reading the oldest entry makes it the most recently used
+        self.cache.get(keys[0])
+
+        self.cache.max_bytes = os.path.getsize(self.cache.path(keys[0])) * 2
+        self.assertEqual(self.cache.prune(), 1)
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+    def test_page_content_uses_cache(self):
+        from_path = self.write("index.md", "# Title\n\nSome **bold** text")
+        expected = ("Title", "<div><h1>Title</h1><p>Some <b>bold</b> text</p></div>")
+        self.assertEqual(textnode.page_content(from_path), expected)
+
+        render_cache.configure(self.cache.cache_dir)
+        self.assertEqual(textnode.page_content(from_path), expected)
+        self.assertEqual(textnode.page_content(from_path), expected)
+        self.assertEqual(stats.get("render_cache_misses"), 1)
+        self.assertEqual(stats.get("render_cache_hits"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import contextlib
+import io
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from scheduler import PageBuildError, build_pages
+
+
+class TestBuildPages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.path("template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.pages = []
+        for i in range(6):
+            from_path = self.path(f"page{i}.md")
+            self.write(from_path, f"# Page {i}\n\nBody {i}")
+            self.pages.append((from_path, self.path("out", f"page{i}.html")))
+
+    def run_build(self, jobs):
+        out = io.StringIO()
+        err = io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                build_pages(self.pages, self.template, "/", jobs=jobs, chunksize=2)
+            except PageBuildError as e:
+                return out.getvalue(), e
+        return out.getvalue(), None
+
+    def test_parallel_renders_every_page_in_order(self):
+        log, error = self.run_build(jobs=3)
+        self.assertIsNone(error)
+        positions = [log.index(from_path) for from_path, _ in self.pages]
+        self.assertEqual(positions, sorted(positions))
+        for i, (_, dest_path) in enumerate(self.pages):
+            with open(dest_path) as f:
+                self.assertIn(f"<title>Page {i}</title>", f.read())
+
+    def test_failure_reports_offending_file(self):
+        bad_path = self.pages[2][0]
+        self.write(bad_path, "no heading here")
+        for jobs in (1, 2):
+            _, error = self.run_build(jobs=jobs)
+            self.assertIsInstance(error, PageBuildError)
+            self.assertEqual([path for path, _ in error.failures], [bad_path])
+            self.assertTrue(os.path.isfile(self.pages[5][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
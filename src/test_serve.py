@@ -0,0 +1,127 @@
+import contextlib
+import gzip
+import http.client
+import io
+import os
+import threading
+import unittest
+
+from fixtures import TempDirTestCase
+from serve import SiteStore, make_server
+
+TEMPLATE = '<html><title>{{ Title }}</title><link href="/index.css">{{ Content }}</html>'
+
+
+class TestServe(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.path("content")
+        self.static = self.path("static")
+        self.template = self.path("template.html")
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n" + "Welcome to the site. " * 50)
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nHello")
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+
+        self.store = SiteStore(self.content, self.static, self.template, "/site/")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.store.load()
+        self.server = make_server(self.store, port=0)
+        self.server.RequestHandlerClass.log_message = lambda *args: None
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def write(self, path, text, mtime=None):
+        path = super().write(path, text)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def get(self, path, headers=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1])
+        try:
+            connection.request("GET", path, headers=headers or {})
+            response = connection.getresponse()
+            return response, response.read()
+        finally:
+            connection.close()
+
+    def test_serves_rendered_pages_and_static_files(self):
+        response, body = self.get("/site/blog/post/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "text/html; charset=utf-8")
+        self.assertIn(b'<link href="/site/index.css">', body)
+        self.assertIn(b"<h1>Post</h1>", body)
+
+        response, body = self.get("/site/index.css")
+        self.assertEqual(body, b"body { margin: 0 }")
+        self.assertEqual(self.get("/site/sitemap.xml")[0].status, 200)
+
+    def test_gzip(self):
+        response, body = self.get("/site/", {"Accept-Encoding": "gzip"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        plain = self.get("/site/")[1]
+        self.assertEqual(gzip.decompress(body), plain)
+        self.assertLess(len(body), len(plain))
+
+        response, _ = self.get("/site/", {"Accept-Encoding": "gzip;q=0"})
+        self.assertIsNone(response.getheader("Content-Encoding"))
+
+    def test_gzip_has_its_own_etag(self):
+        plain_etag = self.get("/site/")[0].getheader("ETag")
+        gzip_etag = self.get("/site/", {"Accept-Encoding": "gzip"})[0].getheader("ETag")
+        self.assertNotEqual(gzip_etag, plain_etag)
+
+        for etag in (plain_etag, gzip_etag):
+            response, _ = self.get("/site/", {"Accept-Encoding": "gzip", "If-None-Match": etag})
+            self.assertEqual(response.status, 304)
+            self.assertEqual(response.getheader("ETag"), gzip_etag)
+            self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        response, _ = self.get("/site/", {"If-None-Match": gzip_etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(response.getheader("ETag"), plain_etag)
+
+    def test_conditional_requests(self):
+        response, _ = self.get("/site/")
+        etag = response.getheader("ETag")
+        last_modified = response.getheader("Last-Modified")
+        self.assertEqual(self.get("/site/", {"If-None-Match": etag})[0].status, 304)
+        self.assertEqual(self.get("/site/", {"If-Modified-Since": last_modified})[0].status, 304)
+        self.assertEqual(self.get("/site/", {"If-None-Match": '"other"', "If-Modified-Since": last_modified})[0].status, 200)
+
+    def test_redirects_and_missing(self):
+        response, _ = self.get("/site/blog/post")
+        self.assertEqual(response.status, 301)
+        self.assertEqual(response.getheader("Location"), "/site/blog/post/")
+        self.assertEqual(self.get("/site")[0].getheader("Location"), "/site/")
+        self.assertEqual(self.get("/elsewhere/")[0].status, 404)
+        self.assertEqual(self.get("/site/../../etc/passwd")[0].status, 404)
+
+    def test_refresh_invalidates_changed_entries(self):
+        home = self.store.get("index.html")
+        post_path = os.path.join(self.content, "blog", "post", "index.md")
+        self.write(post_path, "# Edited\n\nHello", mtime=1_000_000)
+        self.write(os.path.join(self.content, "broken.md"), "no heading")
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(self.store.refresh(), 2)
+
+        self.assertIn(b"<h1>Edited</h1>", self.get("/site/blog/post/")[1])
+        self.assertIs(self.store.get("index.html"), home)
+        self.assertEqual(self.get("/site/broken.html")[0].status, 500)
+
+        os.remove(post_path)
+        self.assertEqual(self.store.refresh(), 1)
+        self.assertEqual(self.get("/site/blog/post/")[0].status, 404)
+        self.assertNotIn(b"/blog/post/", self.get("/site/sitemap.xml")[1])
+
+        self.write(self.template, "<main>{{ Content }}</main>", mtime=2_000_000)
+        self.store.refresh()
+        self.assertTrue(self.get("/site/")[1].startswith(b"<main>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
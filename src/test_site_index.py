@@ -0,0 +1,104 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+import site_index
+from fixtures import TempDirTestCase
+from incremental import generate_pages_incremental
+
+
+class TestSiteIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.public = self.path("public")
+        self.entries = {}
+        for rel_path, title, text, mtime in (
+            ("index.md", "Home", "Home\nWelcome to the club", 1000),
+            ("blog/old/index.md", "Old post", "Old post\nAbout hobbits & elves", 2000),
+            ("blog/new/index.md", "New post", "New post\nAbout elves only", 3000),
+        ):
+            from_path = self.write(os.path.join("content", rel_path), f"# {title}")
+            os.utime(from_path, (mtime, mtime))
+            dest_path = os.path.join(self.public, rel_path.replace(".md", ".html"))
+            self.entries[dest_path] = site_index.page_entry(from_path, title, text, {})
+
+    def tearDown(self):
+        site_index.reset()
+
+    def test_page_url(self):
+        self.assertEqual(site_index.page_url(os.path.join(self.public, "index.html"), self.public, "/site/"), "/site/")
+        self.assertEqual(
+            site_index.page_url(os.path.join(self.public, "blog", "a", "index.html"), self.public, "/"), "/blog/a/")
+        self.assertEqual(site_index.page_url(os.path.join(self.public, "about.html"), self.public, "/"), "/about.html")
+
+    def test_artifacts(self):
+        artifacts = site_index.artifacts(self.entries, self.public, "/site/", "https://example.com/")
+        self.assertEqual(set(artifacts), set(site_index.ARTIFACT_PATHS))
+
+        sitemap = artifacts[site_index.SITEMAP_PATH]
+        self.assertIn("<loc>https://example.com/site/blog/new/</loc>", sitemap)
+        self.assertEqual(sitemap.count("<url>"), 3)
+
+        feed = artifacts[site_index.FEED_PATH]
+        self.assertEqual(feed.count("<item>"), 2)
+        self.assertLess(feed.index("New post"), feed.index("Old post"))
+        self.assertIn("<description>About hobbits &amp; elves</description>", feed)
+        self.assertIn("<title>Home</title>", feed)
+
+    def test_search_index_round_trip(self):
+        index = json.loads(site_index.artifacts(self.entries, self.public, "/", "")[site_index.SEARCH_INDEX_PATH])
+        postings = site_index.decode_search_index(index)
+        self.assertEqual(postings["elves"], [1, 2])
+        self.assertEqual(index["docs"][postings["welcome"][0]], ["/", "Home"])
+        # Front coding: "post" follows "only" and shares nothing, "posts" would share 4
+        terms = [term for term in postings]
+        self.assertEqual(terms, sorted(terms))
+        self.assertEqual(site_index.search(index, "About ELVES"), [["/blog/new/", "New post"], ["/blog/old/", "Old post"]])
+        self.assertEqual(site_index.search(index, "hobbits elves"), [["/blog/old/", "Old post"]])
+        self.assertEqual(site_index.search(index, "dragons"), [])
+
+    def test_page_entry_keeps_terms_not_text(self):
+        entry = next(iter(self.entries.values()))
+        self.assertNotIn("text", entry)
+        self.assertEqual(entry["terms"], "club home the to welcome")
+        self.assertEqual(entry["summary"], "Welcome to the club")
+
+    def test_page_index_updates_match_a_fresh_index(self):
+        index = site_index.PageIndex(self.entries)
+        site_index.artifacts(index, self.public, "/", "")
+        new, old = sorted(path for path in self.entries if "blog" in path)
+        index.add(new, site_index.page_entry(self.entries[new]["source"], "New post", "New post\nAbout dwarves", {}))
+        index.remove(old)
+        self.assertNotIn("hobbits", index.postings)
+        self.assertNotIn("elves", index.gaps)
+        self.assertEqual(site_index.artifacts(index, self.public, "/", ""),
+                         site_index.artifacts(dict(index.entries), self.public, "/", ""))
+
+        added = os.path.join(self.public, "about.html")
+        index.add(added, site_index.page_entry(self.entries[new]["source"], "About", "About dwarves", {}))
+        self.assertEqual(index.gaps, {})
+        index_json = json.loads(site_index.artifacts(index, self.public, "/", "")[site_index.SEARCH_INDEX_PATH])
+        self.assertEqual(site_index.search(index_json, "dwarves"), [["/about.html", "About"], ["/blog/new/", "New post"]])
+
+    def test_incremental_build_keeps_metadata_of_skipped_pages(self):
+        template = self.write("template.html", "{{ Content }}")
+        manifest = self.path("manifest.json")
+        content = self.path("content")
+        for expected_rendered in (3, 0):
+            with contextlib.redirect_stdout(io.StringIO()):
+                rendered, _, _ = generate_pages_incremental(content, template, self.public, "/", manifest)
+            self.assertEqual(rendered, expected_rendered)
+            entries = site_index.drain()
+            self.assertEqual(sorted(entry["title"] for entry in entries.values()), ["Home", "New post", "Old post"])
+
+        # The entries live next to the manifest, not in it
+        with open(manifest) as f:
+            self.assertNotIn("index", json.load(f))
+        self.assertEqual(site_index.load_entries(site_index.entries_path(manifest)), entries)
+        self.assertEqual(site_index.entries_path(manifest), self.path("manifest.index.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from static_sync import sync_static
+
+
+class TestSyncStatic(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = self.path("static")
+        self.public = self.path("public")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def sync(self, previous=None, **kwargs):
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            files = sync_static(self.static, self.public, previous, **kwargs)
+        return files, log.getvalue()
+
+    def test_copies_then_skips_unchanged(self):
+        files, log = self.sync()
+        self.assertEqual(files, [os.path.join("images", "a.png"), "index.css"])
+        self.assertIn("copied 2, unchanged 0", log)
+        self.assertEqual(self.read(os.path.join(self.public, "images", "a.png")), "png")
+
+        _, log = self.sync(files)
+        self.assertIn("copied 0, unchanged 2", log)
+
+    def test_copies_changed_file(self):
+        files, _ = self.sync()
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        _, log = self.sync(files)
+        self.assertIn("copied 1, unchanged 1", log)
+        self.assertEqual(self.read(os.path.join(self.public, "index.css")), "body { margin: 0 }")
+
+    def test_hash_catches_same_size_and_mtime(self):
+        files, _ = self.sync()
+        css = os.path.join(self.public, "index.css")
+        stat = os.stat(css)
+        self.write(css, "body {!")
+        os.utime(css, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        _, log = self.sync(files)
+        self.assertIn("copied 0", log)
+        _, log = self.sync(files, use_hash=True)
+        self.assertIn("copied 1", log)
+        self.assertEqual(self.read(css), "body {}")
+
+    def test_removes_only_known_orphans(self):
+        files, _ = self.sync()
+        self.write(os.path.join(self.public, "index.html"), "<p>page</p>")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+
+        _, log = self.sync(files)
+        self.assertIn("removed 1", log)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_link(self):
+        self.sync(link=True)
+        self.assertTrue(os.path.samefile(
+            os.path.join(self.static, "index.css"),
+            os.path.join(self.public, "index.css"),
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
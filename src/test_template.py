@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from template import Template, clear_template_cache, load_template, minify_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_segments_and_slots(self):
+        template = Template("<title>{{ Title }}</title><p>{{ Content }}</p>")
+        self.assertEqual(template.segments, ["<title>", "</title><p>", "</p>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(
+            template.render("Hi", "<p>body</p>"),
+            "<title>Hi</title><p>body</p>",
+        )
+
+    def test_basepath_rewrite(self):
+        template = Template(
+            '<link href="/index.css" />{{ Content }}<img src="/a.png" />',
+            "/site/",
+        )
+        self.assertEqual(template.segments[0], '<link href="/site/index.css" />')
+        self.assertEqual(
+            template.render("t", '<a href="/blog">x</a><a href="https://x.dev">y</a>'),
+            '<link href="/site/index.css" /><a href="/site/blog">x</a>'
+            '<a href="https://x.dev">y</a><img src="/site/a.png" />',
+        )
+
+    def test_minify_template(self):
+        text = (
+            "<!doctype html>\n<html>\n  <head>\n    <meta charset=\"utf-8\" />\n"
+            "    <title>{{ Title }}</title>\n  </head>\n  <!-- layout -->\n"
+            "  <body>\n    <nav><a href=\"/\">Home</a>   <a href=\"/blog\">Blog</a></nav>\n"
+            "    <pre>  keep\n  this</pre>\n    <article>\n      {{ Content }}\n    </article>\n"
+            "  </body>\n</html>\n"
+        )
+        self.assertEqual(
+            minify_template(text),
+            '<!doctype html><html><head><meta charset="utf-8"><title>{{ Title }}</title></head>'
+            '<body><nav><a href="/">Home</a> <a href="/blog">Blog</a></nav>'
+            "<pre>  keep\n  this</pre><article>{{ Content }}</article></body></html>",
+        )
+        self.assertEqual(minify_template("a <!-- x --> b"), "a b")
+
+    def test_minified_template(self):
+        text = "<html>\n  <title>{{ Title }}</title>\n  <link href=\"/a.css\" />\n</html>\n"
+        template = Template(text, "/site/", minify=True)
+        self.assertEqual(template.render("T", "x"), '<html><title>T</title><link href="/site/a.css"></html>')
+        self.assertEqual(template.bytes_saved, len(text) - len(minify_template(text)))
+        self.assertEqual(Template(text).bytes_saved, 0)
+
+    def test_load_template_cached_until_modified(self):
+        clear_template_cache()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("{{ Content }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            self.assertIsNot(load_template(path, "/other/"), first)
+            self.assertIsNot(load_template(path, minify=True), first)
+
+            with open(path, "w") as f:
+                f.write("<main>{{ Content }}</main>")
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            self.assertEqual(load_template(path).render("", "x"), "<main>x</main>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,10 @@
+import os
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+import stats
+import textnode
+from fixtures import TempDirTestCase
+from textnode import TextNode, TextType, text_node_to_html_node, write_page
 
 
 class TestTextNode(unittest.TestCase):
@@ -57,6 +61,12 @@ class TestTextNode(unittest.TestCase):
             "TextNode(This is a text node, text, https://www.boot.dev)", repr(node)
         )
 
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = True
+
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text(self):
@@ -83,6 +93,52 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.value, "This is bold")
 
 
-   
+class TestWritePage(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest_path = self.path("blog", "index.html")
+        stats.reset()
+
+    def tearDown(self):
+        stats.reset()
+
+    def test_unchanged_output_is_left_alone(self):
+        self.assertTrue(write_page(self.dest_path, "<p>café</p>"))
+        os.utime(self.dest_path, ns=(0, 0))
+        self.assertFalse(write_page(self.dest_path, "<p>café</p>"))
+        self.assertEqual(os.stat(self.dest_path).st_mtime_ns, 0)
+
+        self.assertTrue(write_page(self.dest_path, "<p>cafe</p>", fsync=True))
+        with open(self.dest_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>cafe</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest_path)), ["index.html"])
+        self.assertEqual(stats.get("outputs_written"), 2)
+        self.assertEqual(stats.get("outputs_skipped"), 1)
+
+
+class TestMinify(unittest.TestCase):
+    def setUp(self):
+        stats.reset()
+
+    def tearDown(self):
+        textnode.set_minify(False)
+        stats.reset()
+
+    def test_minified_content(self):
+        markdown = "# Title\n\nSome  text ![pic](a.png)\n\n```\nkeep   this\n  indented\n```"
+        _, full, _, _ = textnode.content_from_markdown(markdown)
+        version = textnode.parser_version()
+
+        textnode.set_minify(True)
+        _, content, _, _ = textnode.content_from_markdown(markdown)
+        self.assertEqual(
+            content,
+            '<div><h1>Title</h1><p>Some text <img src="a.png" alt="pic"></p>'
+            "<pre><code>keep   this\n  indented\n</code></pre></div>",
+        )
+        self.assertEqual(stats.get("minify_bytes_saved"), len(full) - len(content))
+        self.assertNotEqual(textnode.parser_version(), version)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
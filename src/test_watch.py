@@ -0,0 +1,100 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+import site_index
+import textnode
+from fixtures import TempDirTestCase
+from incremental import generate_pages_incremental
+from manifest import load_manifest
+from watch import Watcher
+
+
+class TestWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.path("content")
+        self.static = self.path("static")
+        self.public = self.path("public")
+        self.template = self.path("template.html")
+        self.manifest = self.path("manifest.json")
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_incremental(self.content, self.template, self.public, "/", self.manifest)
+            self.watcher = Watcher(self.content, self.static, self.template, self.public, "/", self.manifest)
+            self.watcher.start()
+
+    def write(self, path, text):
+        path = super().write(path, text)
+        # Make sure the edit is visible even on coarse mtime clocks
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def poll(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.watcher.poll()
+
+    def test_no_changes(self):
+        self.assertEqual(self.poll(), (0, 0))
+
+    def test_markdown_change_rebuilds_one_page(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited")
+        self.assertEqual(self.poll(), (1, 0))
+        self.assertIn("Edited", self.read("public", "index.html"))
+
+        manifest = load_manifest(self.manifest)
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = generate_pages_incremental(self.content, self.template, self.public, "/", self.manifest)
+        self.assertEqual(counts, (0, 2, 0))
+        self.assertEqual(len(manifest["pages"]), 2)
+
+    def test_markdown_change_updates_search_terms(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHobbits")
+        self.poll()
+        search = json.loads(self.read("public", "search-index.json"))
+        self.assertEqual(site_index.search(search, "hobbits"), [["/", "Home"]])
+        self.assertEqual(site_index.search(search, "welcome"), [])
+        entries = site_index.load_entries(site_index.entries_path(self.manifest))
+        self.assertEqual(entries[self.path("public", "index.html")]["terms"], "hobbits home")
+
+    def test_new_and_removed_pages(self):
+        self.write(os.path.join(self.content, "new", "index.md"), "# New\n\nPage")
+        self.assertEqual(self.poll(), (1, 0))
+        self.assertIn("<h1>New</h1>", self.read("public", "new", "index.html"))
+        self.assertIn("<loc>/new/</loc>", self.read("public", "sitemap.xml"))
+
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        self.poll()
+        self.assertFalse(os.path.exists(self.path("public", "blog", "index.html")))
+        self.assertNotIn("<loc>/blog/</loc>", self.read("public", "sitemap.xml"))
+
+    def test_template_change_uses_cached_content(self):
+        calls = []
+        original = textnode.markdown_to_html_node
+        textnode.markdown_to_html_node = lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs)
+        try:
+            self.write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+            self.assertEqual(self.poll(), (2, 0))
+        finally:
+            textnode.markdown_to_html_node = original
+        self.assertEqual(calls, [])
+        self.assertIn("<h2>Blog</h2>", self.read("public", "blog", "index.html"))
+
+    def test_static_change_syncs_one_file(self):
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        self.assertEqual(self.poll(), (0, 1))
+        self.assertEqual(self.read("public", "index.css"), "body { margin: 0 }")
+
+        os.remove(os.path.join(self.static, "index.css"))
+        self.assertEqual(self.poll(), (0, 1))
+        self.assertFalse(os.path.exists(self.path("public", "index.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
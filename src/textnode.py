@@ -1,10 +1,22 @@
 
-from htmlnode import HTMLNode, ParentNode
+from htmlnode import HTMLNode, Minifier, ParentNode
 from leafnode import LeafNode
+from template import load_template
+import render_cache
+import site_index
+import stats
+from discovery import collect_pages, page_dest_path, scan
+from front_matter import DELIMITER, parse_date, split_front_matter
+from collections import OrderedDict
 from enum import Enum
-from pathlib import Path
 import os, shutil
 import re
+import threading
+import time
+
+# Bump whenever a change alters the HTML produced for the same markdown, so
+# cached renders from older versions are not reused
+PARSER_VERSION = 4
 
 class BlockType(Enum):
     PARAGRAPH     = "paragraph"
@@ -23,6 +35,9 @@ class TextType(Enum):
     IMAGE  = 'image' 
 
 class TextNode():
+    # Pages produce one TextNode per inline span, so skip the per-instance dict
+    __slots__ = ("text", "type", "url")
+
     def __init__(self, text_in, type_in, url_in=None):
         self.text = text_in
         self.type = type_in
@@ -75,112 +90,402 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     
     return new_nodes
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+# Images and links in one scan: group 1 is "!" for an image, unmatched for
+# a link. No lookbehind is needed, a "[" right after "!" has already been
+# tried as an image, and when that fails it cannot be a link either. A
+# link's url stops short of a whole image, which splitting images before
+# links would have taken out first, e.g. in "[a](![b](c)". Only a "!" in
+# the url pays for that check.
+IMAGE_OR_LINK_PATTERN = re.compile(
+    r"(?:(!)\[|\[)([^\[\]]*)\]\("
+    r"((?(1)[^\(\)]*|[^\(\)!]*(?:(?!!\[[^\[\]]*\]\([^\(\)]*\))![^\(\)!]*)*))\)"
+)
+IMAGE_OR_LINK_TYPES = {"!": TextType.IMAGE, None: TextType.LINK}
+
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
-
-def split_nodes_image(old_nodes):
+    return LINK_PATTERN.findall(text)
+
+def extract_markdown_images_and_links(text):
+    '''
+    Same as (extract_markdown_images(text), extract_markdown_links(text)),
+    but reading text once. Images are taken first, as when splitting, so a
+    link overlapping one is left out.
+    '''
+    matches = IMAGE_OR_LINK_PATTERN.findall(text)
+    images = [(alt, url) for opener, alt, url in matches if opener]
+    links = [(alt, url) for opener, alt, url in matches if not opener]
+    return images, links
+
+def split_nodes_pattern(old_nodes, pattern, text_type):
+    '''
+    Split the TEXT nodes of old_nodes around every match of pattern, whose
+    two groups are the label and url of a text_type node. text_type may
+    instead be a dict keyed by a leading third group, the opener, as for
+    IMAGE_OR_LINK_PATTERN. Slices are taken at the match positions, so each
+    text is scanned once instead of being re-split for every match.
+    '''
+    types = text_type if isinstance(text_type, dict) else None
     new_nodes = []
     for old_node in old_nodes:
         if old_node.type != TextType.TEXT:
             new_nodes.append(old_node)
             continue
         original_text = old_node.text
-        images = extract_markdown_images(original_text)
-        if len(images) == 0:
+        pos = 0
+        for match in pattern.finditer(original_text):
+            start, end = match.span()
+            if start > pos:
+                new_nodes.append(TextNode(original_text[pos:start], TextType.TEXT))
+            if types is None:
+                label, url = match.groups()
+                new_nodes.append(TextNode(label, text_type, url))
+            else:
+                opener, label, url = match.groups()
+                new_nodes.append(TextNode(label, types[opener], url))
+            pos = end
+        if pos == 0:
             new_nodes.append(old_node)
-            continue
-        for image in images:
-            sections = original_text.split(f"![{image[0]}]({image[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("invalid markdown, image section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(
-                TextNode(
-                    image[0],
-                    TextType.IMAGE,
-                    image[1],
-                )
-            )
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
+        elif pos < len(original_text):
+            new_nodes.append(TextNode(original_text[pos:], TextType.TEXT))
     return new_nodes
 
+def split_nodes_image(old_nodes):
+    return split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
+
 
 def split_nodes_link(old_nodes):
-    new_nodes = []
-    for old_node in old_nodes:
-        if old_node.type != TextType.TEXT:
-            new_nodes.append(old_node)
-            continue
-        original_text = old_node.text
-        links = extract_markdown_links(original_text)
-        if len(links) == 0:
-            new_nodes.append(old_node)
-            continue
-        for link in links:
-            sections = original_text.split(f"[{link[0]}]({link[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("invalid markdown, link section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(link[0], TextType.LINK, link[1]))
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
-    return new_nodes
+    return split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
 
-def text_to_textnodes(text):
+def split_nodes_images_and_links(old_nodes):
+    '''
+    Same as split_nodes_link(split_nodes_image(old_nodes)), but reading
+    each text once
+    '''
+    return split_nodes_pattern(old_nodes, IMAGE_OR_LINK_PATTERN, IMAGE_OR_LINK_TYPES)
+
+def text_to_textnodes_pipeline(text):
     nodes = [TextNode(text_in=text, type_in=TextType.TEXT)]
     nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
     nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
     nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    return split_nodes_images_and_links(nodes)
+
+# One alternation for every inline span. Closed spans are tried first; a
+# bare delimiter only matches when its closing half is missing.
+INLINE_PATTERN = re.compile(
+    r"\*\*(.*?)\*\*"
+    r"|_(.*?)_"
+    r"|`(.*?)`"
+    r"|!\[([^\[\]]*)\]\(([^\(\)]*)\)"
+    r"|(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+    r"|\*\*|[_`]",
+    re.DOTALL,
+)
+# Keyed by the lastindex of an INLINE_PATTERN match
+INLINE_GROUP_TYPES = {
+    1: TextType.BOLD,
+    2: TextType.ITALIC,
+    3: TextType.CODE,
+    5: TextType.IMAGE,
+    7: TextType.LINK,
+}
+
+def tokenize_inline(text):
+    '''
+    Single left-to-right pass over text producing the same TextNode stream
+    as the split pipeline for well-formed markdown. Every span is matched in
+    place by one compiled pattern, so long link-heavy paragraphs stay linear
+    instead of re-splitting the remaining text for every match.
+
+    Unlike the pipeline, whichever span opens first wins, so `a_b` is code
+    and [a_b](url) is a link rather than an unclosed italic.
+    '''
+    nodes = []
+    append = nodes.append
+    pos = 0
+    for match in INLINE_PATTERN.finditer(text):
+        index = match.lastindex
+        if index is None:
+            raise ValueError("Invalid markdown. unclosed format.")
+
+        start, end = match.span()
+        if start > pos:
+            append(TextNode(text[pos:start], TextType.TEXT))
+        pos = end
+
+        if index > 3:
+            label, url = match.group(index - 1, index)
+            append(TextNode(label, INLINE_GROUP_TYPES[index], url))
+        else:
+            inner = match.group(index)
+            if inner != "":
+                append(TextNode(inner, INLINE_GROUP_TYPES[index]))
+
+    if pos < len(text):
+        append(TextNode(text[pos:], TextType.TEXT))
     return nodes
 
-def markdown_to_blocks(markdown):
-    block_strings = markdown.split("\n\n")
-    cleaned_blocks = list(map(lambda x: [x.strip() for x in block_strings if x], block_strings))
+INLINE_ENGINES = {
+    "tokenizer": tokenize_inline,
+    "pipeline": text_to_textnodes_pipeline,
+}
+inline_engine = tokenize_inline
+inline_engine_name = "tokenizer"
+
+def set_inline_engine(name):
+    '''
+    Select the implementation behind text_to_textnodes: "tokenizer" (the
+    default) or the original five-stage "pipeline"
+    '''
+    global inline_engine, inline_engine_name
+    if name not in INLINE_ENGINES:
+        raise ValueError(f"invalid inline engine: {name}")
+    inline_engine = INLINE_ENGINES[name]
+    inline_engine_name = name
+    if inline_memo is not None:
+        inline_memo.clear()
+
+def text_to_textnodes(text):
+    return inline_engine(text)
+
+def iter_lines(text):
+    '''
+    Yield the lines of text one at a time without building a list of them
+    '''
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+def iter_markdown_blocks(lines):
+    '''
+    lines - Any iterable of lines, such as an open file or iter_lines(text)
+
+    Lazily yield the stripped blocks of a markdown document. Blocks are
+    separated by blank lines, except inside a ``` fenced code block, which
+    always stays one block even if it contains blank lines.
+    '''
+    block = []
+    in_code = False
+    for line in lines:
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
 
-    return cleaned_blocks[0]
+        if in_code:
+            block.append(line)
+            if stripped.endswith("```"):
+                in_code = False
+            continue
+
+        if stripped == "":
+            if block:
+                yield "\n".join(block).strip()
+                block = []
+            continue
+
+        # A fence that does not also close on the same line opens a code block
+        if stripped.startswith("```") and (len(stripped) < 6 or not stripped.endswith("```")):
+            in_code = True
+        block.append(line)
+
+    if block:
+        yield "\n".join(block).strip()
+
+def markdown_to_blocks(markdown):
+    return list(iter_markdown_blocks(iter_lines(markdown)))
+
+BLOCK_PREFIX_PATTERN = re.compile(r"\s*(\S+)")
+ORDERED_ITEM_PATTERN = re.compile(r"\d+\.")
+# A fence line with an info string, e.g. ```python, that does not close on
+# the same line
+FENCE_INFO_PATTERN = re.compile(r"\s*```[^`\n]*\n")
+BLOCK_DELIMITER_TYPES = {
+    "#": BlockType.HEADING,
+    "##": BlockType.HEADING,
+    "###": BlockType.HEADING,
+    "####": BlockType.HEADING,
+    "#####": BlockType.HEADING,
+    "######": BlockType.HEADING,
+    "```": BlockType.CODE,
+    ">": BlockType.QUOTE,
+    "-": BlockType.UNORDEREDLIST,
+}
 
 def block_to_block_type(md_block):
-    if len(md_block) == 0:
+    # Only the first token decides the type, so never read past it
+    prefix = BLOCK_PREFIX_PATTERN.match(md_block)
+    if prefix is None:
         return BlockType.PARAGRAPH
 
-    delimiter = md_block.split()[0].strip()
-
-    match delimiter:
-        case "#" | "##" | "###" | "####" | "#####" | "######":
-            return BlockType.HEADING
-        case "```":
-            return BlockType.CODE
-        case ">":
-            return BlockType.QUOTE
-        case "-":
-            return BlockType.UNORDEREDLIST
-        case str() if re.fullmatch(r"\d*.", delimiter):
-            return BlockType.ORDEREDLIST
-        case _:
-            return BlockType.PARAGRAPH
+    delimiter = prefix.group(1)
+    block_type = BLOCK_DELIMITER_TYPES.get(delimiter)
+    if block_type is not None:
+        return block_type
+    if delimiter.startswith("```") and FENCE_INFO_PATTERN.match(md_block):
+        return BlockType.CODE
+    if ORDERED_ITEM_PATTERN.fullmatch(delimiter):
+        return BlockType.ORDEREDLIST
+    return BlockType.PARAGRAPH
+
+class ParseLimitError(ValueError):
+    pass
+
+# An opening bracket or parenthesis followed by another before any closes,
+# i.e. nesting at least two deep. Flat links like [a](b) never match.
+NESTED_BRACKET_PATTERN = re.compile(r"[\[(][^\[\]()]*[\[(]")
+
+class ParseLimits():
+    def __init__(self, max_input_size=16 * 1024 * 1024, max_nodes=1_000_000, max_nesting=32, max_seconds=10.0):
+        '''
+        Per-document guards against broken or hostile markdown. None turns
+        a limit off.
+
+        max_input_size - Bytes of markdown (characters, for a string) beyond
+        which a document is rejected with ParseLimitError
+        max_nodes - Inline nodes a document may produce; once spent, the
+        rest of it takes the plain text fallback
+        max_nesting - Inline text whose brackets or parentheses nest deeper
+        than this takes the plain text fallback
+        max_seconds - Parse time after which the rest of the document takes
+        the plain text fallback
+
+        The fallback renders inline text as-is, without looking for spans,
+        which is linear in its length. Each use counts as a
+        parse_fallbacks stat.
+        '''
+        self.max_input_size = max_input_size
+        self.max_nodes = max_nodes
+        self.max_nesting = max_nesting
+        self.max_seconds = max_seconds
+
+    def check_input_size(self, size):
+        if self.max_input_size is not None and size > self.max_input_size:
+            raise ParseLimitError(f"Document is {size} bytes, over the limit of {self.max_input_size}")
+
+    def settings(self):
+        return (self.max_input_size, self.max_nodes, self.max_nesting, self.max_seconds)
 
-def markdown_to_html_node(markdown):
-    md_blocks = markdown_to_blocks(markdown)
+    def __repr__(self):
+        return f"{self.__class__.__name__}{self.settings()}"
+
+class ParseBudget():
+    def __init__(self, limits):
+        '''
+        What is left of limits while one document is being parsed
+        '''
+        self.limits = limits
+        self.nodes = 0
+        self.deadline = None
+        if limits.max_seconds is not None:
+            self.deadline = time.perf_counter() + limits.max_seconds
+        self.exhausted = False
+
+    def needs_fallback(self, text):
+        if not self.exhausted and self.deadline is not None and time.perf_counter() > self.deadline:
+            self.exhausted = True
+        if self.exhausted:
+            return True
+        max_nesting = self.limits.max_nesting
+        # Counting and the search run in C; only text that really nests
+        # (not just many flat links) is walked character by character
+        if (max_nesting is not None and text.count("[") + text.count("(") > max_nesting
+                and NESTED_BRACKET_PATTERN.search(text)):
+            return nesting_depth(text) > max_nesting
+        return False
+
+    def charge(self, nodes):
+        self.nodes += nodes
+        if self.limits.max_nodes is not None and self.nodes > self.limits.max_nodes:
+            self.exhausted = True
+
+def nesting_depth(text):
+    depth = deepest = 0
+    for char in text:
+        if char in "[(":
+            depth += 1
+            if depth > deepest:
+                deepest = depth
+        elif char in "])" and depth > 0:
+            depth -= 1
+    return deepest
+
+parse_limits = ParseLimits()
+# The budget of the document being parsed on this thread, if any
+_parse_state = threading.local()
+
+def set_parse_limits(*args, **kwargs):
+    '''
+    Replace the parse limits, taking the same arguments as ParseLimits, e.g.
+    set_parse_limits(max_seconds=2). Limits not given keep their defaults.
+    '''
+    global parse_limits
+    parse_limits = ParseLimits(*args, **kwargs)
+
+# Whether pages are written minified, see set_minify
+minify_html = False
+
+def set_minify(enabled):
+    '''
+    Serialize content compactly (see htmlnode.Minifier) and have callers
+    load templates minified. Cached renders are keyed on this, so full and
+    minified content never mix.
+    '''
+    global minify_html
+    minify_html = bool(enabled)
+
+# The fingerprint.AssetManifest pages link to, see set_asset_manifest
+asset_manifest = None
+
+def set_asset_manifest(assets):
+    '''
+    Have page templates point links to static assets at the fingerprinted
+    copies listed in assets, or at the plain names again for None
+    '''
+    global asset_manifest
+    asset_manifest = assets
+
+def page_template(template_path, basepath):
+    '''
+    The compiled template for rendering pages with the current minify and
+    asset settings
+    '''
+    return load_template(template_path, basepath, minify_html, asset_manifest)
+
+def markdown_to_html_node(markdown, front_matter=True):
+    '''
+    markdown - The document as a string, or an iterable of its lines (e.g.
+    an open file), which is read block by block. Front matter is skipped.
+    front_matter - False if markdown is a body whose front matter the
+    caller has already split off
+
+    Parsing is bounded by parse_limits, see ParseLimits.
+    '''
+    if isinstance(markdown, str):
+        parse_limits.check_input_size(len(markdown))
+        markdown = iter_lines(markdown)
+    if front_matter:
+        _, markdown = split_front_matter(markdown)
+    md_blocks = iter_markdown_blocks(markdown)
     children = []
 
-    for block in md_blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
+    outer_budget = getattr(_parse_state, "budget", None)
+    _parse_state.budget = ParseBudget(parse_limits)
+    try:
+        for block in md_blocks:
+            html_node = block_to_html_node(block)
+            children.append(html_node)
+    finally:
+        _parse_state.budget = outer_budget
     return ParentNode("div", children, None)
 
 
@@ -189,7 +494,9 @@ def block_to_html_node(block):
     match block_type:
         case BlockType.CODE:
             if block.startswith("```") and block.endswith("```"):
-                value = block[4:-3]
+                # The code starts on the line after the fence and its info string
+                newline = block.find("\n")
+                value = block[newline + 1 if newline != -1 else 4:-3]
                 text_node = TextNode(value, TextType.TEXT)
                 child = text_node_to_html_node(text_node)
                 code = ParentNode("code", [child])
@@ -248,7 +555,73 @@ def block_to_html_node(block):
         case _:
             raise ValueError(f"Invalide BlockType: {block_type}")
 
+class InlineMemo():
+    def __init__(self, max_entries=4096, max_text_length=1024):
+        '''
+        max_entries - How many distinct fragments to remember, least
+        recently used are dropped first
+        max_text_length - Longer fragments are nearly always unique
+        paragraphs, so they are parsed without being remembered
+
+        A bounded, thread-safe map from raw inline text to the LeafNodes it
+        renders to. The nodes are shared between every tree that uses the
+        fragment, so they must be treated as read-only.
+        '''
+        self.max_entries = max_entries
+        self.max_text_length = max_text_length
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def lookup(self, text, build):
+        if len(text) > self.max_text_length:
+            return build(text)
+
+        with self.lock:
+            children = self.entries.get(text)
+            if children is not None:
+                self.entries.move_to_end(text)
+                stats.incr("inline_memo_hits")
+                return list(children)
+
+        children = build(text)
+        with self.lock:
+            stats.incr("inline_memo_misses")
+            self.entries[text] = children
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return list(children)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self.entries)}/{self.max_entries})"
+
+inline_memo = InlineMemo()
+
+def set_inline_memo(max_entries):
+    '''
+    Resize the inline memo, or turn it off with 0
+    '''
+    global inline_memo
+    inline_memo = InlineMemo(max_entries) if max_entries > 0 else None
+
 def text_to_children(text):
+    budget = getattr(_parse_state, "budget", None)
+    if budget is not None and budget.needs_fallback(text):
+        stats.incr("parse_fallbacks")
+        return [text_node_to_html_node(TextNode(text, TextType.TEXT))]
+
+    if inline_memo is not None:
+        children = inline_memo.lookup(text, build_children)
+    else:
+        children = build_children(text)
+    if budget is not None:
+        budget.charge(len(children))
+    return children
+
+def build_children(text):
     nodes = text_to_textnodes(text)
     children = []
     for node in nodes:
@@ -257,65 +630,204 @@ def text_to_children(text):
     return children
 
 
-def copy_static_to_public(source_dir, destination_dir):
-    if not os.path.exists(destination_dir):
-        os.mkdir(destination_dir)
+def copy_static_to_public(source_dir, destination_dir, files=None):
+    '''
+    files - Paths relative to source_dir to copy, by default every file
+    discovery.scan finds
+    '''
+    if files is None:
+        files = scan(source_dir)
+    os.makedirs(destination_dir, exist_ok=True)
 
-    for item in os.listdir(source_dir):
-        from_path = os.path.join(source_dir, item)
-        to_path = os.path.join(destination_dir, item)
+    for rel_path in files:
+        from_path = os.path.join(source_dir, rel_path)
+        to_path = os.path.join(destination_dir, rel_path)
         print(f"\t* {from_path} -> {to_path}")
 
-        if os.path.isfile(from_path):
-            shutil.copy(from_path, to_path)
-        else:
-            copy_static_to_public(from_path, to_path)
-   
+        os.makedirs(os.path.dirname(to_path), exist_ok=True)
+        shutil.copy(from_path, to_path)
+
 def extract_title(markdown):
-    if len(markdown) == 0 or "#" not in markdown:
+    if len(markdown) == 0 or ("#" not in markdown and not markdown.startswith(DELIMITER)):
         raise Exception("No header in provided markdown")
 
-    lines = markdown.split("\n")
+    return extract_title_from_lines(iter_lines(markdown))
+
+def extract_title_from_lines(lines):
+    '''
+    Return the title from the front matter if it has one, else the first
+    heading found in lines, reading no further than it
+    '''
+    metadata, lines = split_front_matter(lines)
+    if metadata.get("title"):
+        return metadata["title"]
     for line in lines:
         if line.startswith("#"):
-            return line[2:]
+            return line[2:].rstrip("\r\n")
+    raise Exception("No header in provided markdown")
 
 
 def generate_page(from_path, template_path, dest_path, basepath):
     print(f"\t* {from_path} {template_path} -> {dest_path}")
-    from_file = open(from_path, "r")
-    # Read the MD file
-    markdown_content = from_file.read()
-    from_file.close()
-
-    # Read the template file
-    template_file = open(template_path, "r")
-    template = template_file.read()
-    template_file.close()
-
-    html = markdown_to_html_node(markdown_content).to_html()
-
-    title = extract_title(markdown_content)
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
-    template = template.replace('href="/', 'href="'+basepath)
-    template = template.replace('src="/', 'src="' + basepath)
+    # Compiled once and reused until the template file changes
+    template = page_template(template_path, basepath)
+
+    title, content, text, metadata = page_document(from_path)
+    page = render_page_html(template, title, content)
+    write_page(dest_path, page)
+    site_index.record(dest_path, site_index.page_entry(from_path, title, text, metadata))
+
+def parser_version():
+    '''
+    Identifies everything that decides the content HTML for a given
+    markdown file, for keying cached renders
+    '''
+    version = f"{PARSER_VERSION}-{inline_engine_name}"
+    return version + "-min" if minify_html else version
+
+def page_content(from_path):
+    '''
+    Return the title and content HTML of a markdown file, before the
+    template and basepath are applied. With the render cache configured,
+    an unchanged file is served from it instead of being parsed again.
+    '''
+    title, content, _, _ = page_document(from_path)
+    return title, content
+
+def page_document(from_path):
+    '''
+    page_content plus the page's plain text and front matter, for the
+    sitemap, feed and search index. Without a render cache the file is streamed through
+    content_from_lines, the parser reading it block by block; with one it
+    is read whole so its bytes can be looked up by content_from_bytes, the
+    same path the async build and render.render_content take.
+    '''
+    if render_cache.get_cache() is not None:
+        with open(from_path, "rb") as from_file:
+            data = from_file.read()
+        return content_from_bytes(data)
+
+    with open(from_path, "r", encoding="utf-8") as from_file:
+        parse_limits.check_input_size(os.fstat(from_file.fileno()).st_size)
+        return content_from_lines(from_file)
+
+def content_from_bytes(data):
+    '''
+    page_document for markdown that has already been read into memory
+    '''
+    cache = render_cache.get_cache()
+    if cache is not None:
+        key = cache.key(data, parser_version())
+        cached = cache.get(key)
+        if cached is not None:
+            stats.incr("render_cache_hits")
+            return cached
+        stats.incr("render_cache_misses")
+
+    parse_limits.check_input_size(len(data))
+    fallbacks = stats.get("parse_fallbacks")
+    document = content_from_markdown(data.decode("utf-8"))
+    # A render cut short by the parse limits is not worth keeping
+    if cache is not None and stats.get("parse_fallbacks") == fallbacks:
+        cache.put(key, *document)
+    return document
+
+def content_from_markdown(markdown):
+    '''
+    The title, content HTML, plain text and front matter of a markdown
+    string. Nothing is read, written, cached or printed.
+    '''
+    parse_limits.check_input_size(len(markdown))
+    return content_from_lines(iter_lines(markdown))
+
+def content_from_lines(lines):
+    '''
+    content_from_markdown for any iterable of lines, such as an open file.
+    The lines are read once: the title is picked up from the front matter
+    or the first heading as the body goes by, block by block, to the parser.
+    The front matter's date is checked here, so a bad one fails the page
+    like any other parse error.
+    '''
+    metadata, body = split_front_matter(lines)
+    if metadata.get("date"):
+        parse_date(metadata["date"])
+    headings = []
+    node = markdown_to_html_node(_watch_first_heading(body, headings), front_matter=False)
+    title = metadata.get("title") or (headings[0] if headings else None)
+    if title is None:
+        raise Exception("No header in provided markdown")
+    return title, serialize_node(node), node.text_content(), metadata
 
+def _watch_first_heading(lines, headings):
+    '''
+    Pass lines through, appending the title of the first heading among
+    them to headings, as extract_title_from_lines would read it
+    '''
+    for line in lines:
+        yield line
+        if line.startswith("#"):
+            headings.append(line[2:].rstrip("\r\n"))
+            break
+    yield from lines
+
+def serialize_node(node):
+    if not minify_html:
+        return node.to_html()
+    minifier = Minifier()
+    html = node.to_html(minifier)
+    if minifier.saved:
+        stats.incr("minify_bytes_saved", minifier.saved)
+    return html
+
+def render_page_html(template, title, content):
+    if template.bytes_saved:
+        stats.incr("minify_bytes_saved", template.bytes_saved)
+    return template.render(title, content)
+
+def write_page(dest_path, page, fsync=False):
+    '''
+    Write page to dest_path unless the file already holds exactly these
+    bytes, so unchanged outputs keep their mtime and deploys can skip them.
+    Changed pages are written to a temporary file that is renamed over
+    dest_path, so readers never see a half-written page.
+
+    Returns True if the file was written. Counted in stats as
+    outputs_written / outputs_skipped.
+    '''
+    data = page.encode("utf-8")
+    if output_unchanged(dest_path, data):
+        stats.incr("outputs_skipped")
+        return False
 
     dest_dir_path = os.path.dirname(dest_path)
-
     if dest_dir_path != "":
         os.makedirs(dest_dir_path, exist_ok=True)
-    to_file = open(dest_path, "w")
-    to_file.write(template)
+
+    tmp_path = dest_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as to_file:
+            to_file.write(data)
+            if fsync:
+                to_file.flush()
+                os.fsync(to_file.fileno())
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    stats.incr("outputs_written")
+    return True
+
+def output_unchanged(dest_path, data):
+    try:
+        if os.path.getsize(dest_path) != len(data):
+            return False
+        with open(dest_path, "rb") as dest_file:
+            return dest_file.read() == data
+    except OSError:
+        return False
 
 
 def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    for filename in os.listdir(dir_path_content):
-        from_path = os.path.join(dir_path_content, filename)
-        dest_path = os.path.join(dest_dir_path, filename)
-        if os.path.isfile(from_path):
-            dest_path = Path(dest_path).with_suffix(".html")
-            generate_page(from_path, template_path, dest_path, basepath)
-        else:
-            generate_pages_recursive(from_path, template_path, dest_path, basepath)
\ No newline at end of file
+    for from_path, dest_path in collect_pages(dir_path_content, dest_dir_path):
+        generate_page(from_path, template_path, dest_path, basepath)
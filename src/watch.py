@@ -0,0 +1,211 @@
+import os
+import time
+
+import discovery
+import precompress
+import site_index
+import static_sync
+import textnode
+from incremental import page_entry
+from manifest import hash_file, load_manifest, save_manifest
+
+
+def snapshot(root):
+    '''
+    Map every file below root (or root itself, if it is a file) to its
+    (mtime_ns, size)
+    '''
+    if os.path.isfile(root):
+        stat = os.stat(root)
+        return {root: (stat.st_mtime_ns, stat.st_size)}
+
+    files = {}
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def diff_snapshots(before, after):
+    changed = sorted(path for path, stamp in after.items() if before.get(path) != stamp)
+    removed = sorted(path for path in before if path not in after)
+    return changed, removed
+
+
+class Watcher():
+    def __init__(self, content_dir, static_dir, template_path, public_dir, basepath, manifest_path,
+                 static_link=False, ignore=discovery.IGNORE_PATTERNS, site_url="", gzip_min_size=None):
+        '''
+        Keeps the parsed content of every page in memory and rebuilds only
+        what an edit affects: one page per markdown file, every page (from
+        the cached content, without re-parsing) for the template, and one
+        file per static asset. The search postings are updated only for
+        the pages that changed. The build manifest is kept up to date, so a
+        later --incremental build picks up where watch mode left off.
+
+        ignore - Glob patterns for files to leave alone, as for discovery.scan
+        site_url - Passed on to site_index.artifacts, which are rewritten
+        whenever a page's content changes
+        gzip_min_size - If set, keep .gz siblings of the outputs up to date
+        as with precompress.precompress_outputs
+        '''
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.public_dir = public_dir
+        self.basepath = basepath
+        self.manifest_path = manifest_path
+        self.static_link = static_link
+        self.ignore = ignore
+        self.ignore_matcher = discovery.compile_ignore(ignore)
+        self.site_url = site_url
+        self.gzip_min_size = gzip_min_size
+
+        # from_path -> (title, content html)
+        self.pages = {}
+        self.index = site_index.PageIndex()
+        self.snapshots = {}
+
+    def dest_path(self, from_path):
+        rel_path = os.path.relpath(from_path, self.content_dir)
+        return textnode.page_dest_path(os.path.join(self.public_dir, rel_path))
+
+    def start(self):
+        '''
+        Parse every page into the cache and record the current state of the
+        watched files. Call after a build has brought public_dir up to date.
+        '''
+        self.snapshots = self.take_snapshots()
+        for from_path, _ in textnode.collect_pages(self.content_dir, self.public_dir, self.ignore):
+            try:
+                self.parse(from_path)
+            except Exception as e:
+                print(f"\t! {from_path}: {type(e).__name__}: {e}")
+
+    def take_snapshots(self):
+        return {
+            "content": self.watched(snapshot(self.content_dir), self.content_dir, discovery.PAGE_SUFFIXES),
+            "static": self.watched(snapshot(self.static_dir), self.static_dir),
+            "template": snapshot(self.template_path),
+        }
+
+    def watched(self, files, root, suffixes=None):
+        '''
+        Drop the files discovery would not pick up from a snapshot of root
+        '''
+        return {
+            path: stamp for path, stamp in files.items()
+            if discovery.accepts(self.ignore_matcher, discovery.relative_path(path, root), suffixes)
+        }
+
+    def parse(self, from_path):
+        title, content, text, metadata = textnode.page_document(from_path)
+        self.pages[from_path] = title, content
+        self.index.add(self.dest_path(from_path), site_index.page_entry(from_path, title, text, metadata))
+
+    def write(self, from_path):
+        title, content = self.pages[from_path]
+        template = textnode.page_template(self.template_path, self.basepath)
+        textnode.write_page(self.dest_path(from_path), template.render(title, content))
+
+    def poll(self):
+        '''
+        Check the watched files once and rebuild whatever changed. Returns
+        the number of pages rendered and static files synced.
+        '''
+        before = self.snapshots
+        after = self.take_snapshots()
+        self.snapshots = after
+
+        content_changed, content_removed = diff_snapshots(before["content"], after["content"])
+        static_changed, static_removed = diff_snapshots(before["static"], after["static"])
+        template_changed = before["template"] != after["template"]
+        if not (content_changed or content_removed or static_changed or static_removed or template_changed):
+            return 0, 0
+
+        manifest = load_manifest(self.manifest_path)
+        rendered = set()
+
+        for from_path in content_changed:
+            try:
+                self.parse(from_path)
+                self.write(from_path)
+                rendered.add(from_path)
+                print(f"\t* {from_path} -> {self.dest_path(from_path)}")
+            except Exception as e:
+                print(f"\t! {from_path}: {type(e).__name__}: {e}")
+
+        for from_path in content_removed:
+            self.pages.pop(from_path, None)
+            dest_path = self.dest_path(from_path)
+            manifest["pages"].pop(dest_path, None)
+            self.index.remove(dest_path)
+            if os.path.isfile(dest_path):
+                os.remove(dest_path)
+                print(f"\t- {dest_path}")
+
+        if template_changed:
+            for from_path in self.pages:
+                if from_path not in rendered:
+                    self.write(from_path)
+                    rendered.add(from_path)
+            print(f"\t* {self.template_path} -> {len(self.pages)} page(s)")
+
+        template_hash = hash_file(self.template_path)
+        if template_changed:
+            for entry in manifest["pages"].values():
+                entry["template_hash"] = template_hash
+        for from_path in rendered:
+            manifest["pages"][self.dest_path(from_path)] = page_entry(from_path, template_hash, self.basepath)
+        if content_changed or content_removed:
+            self.write_site_index()
+
+        synced = self.sync_static(static_changed, static_removed, manifest)
+        save_manifest(manifest, self.manifest_path)
+        if self.gzip_min_size is not None:
+            self.precompress(manifest)
+        return len(rendered), synced
+
+    def write_site_index(self):
+        # Saved before the manifest, as by generate_pages_incremental
+        site_index.save_entries(self.index.entries, site_index.entries_path(self.manifest_path))
+        artifacts = site_index.artifacts(self.index, self.public_dir, self.basepath, self.site_url)
+        for rel_path, text in artifacts.items():
+            textnode.write_page(os.path.join(self.public_dir, rel_path), text)
+
+    def sync_static(self, changed, removed, manifest):
+        static_files = set(manifest["static"])
+        for from_path in changed:
+            rel_path = os.path.relpath(from_path, self.static_dir)
+            to_path = os.path.join(self.public_dir, rel_path)
+            method = static_sync.copy_file(from_path, to_path, self.static_link)
+            static_files.add(rel_path)
+            print(f"\t* {from_path} -> {to_path} ({method})")
+
+        orphans = [os.path.relpath(from_path, self.static_dir) for from_path in removed]
+        static_sync.remove_orphans(orphans, self.public_dir)
+        manifest["static"] = sorted(static_files.difference(orphans))
+        return len(changed) + len(removed)
+
+    def precompress(self, manifest):
+        outputs = set(manifest["static"]).union(site_index.ARTIFACT_PATHS)
+        outputs.update(os.path.relpath(dest_path, self.public_dir) for dest_path in manifest["pages"])
+        precompress.precompress_outputs(self.public_dir, outputs, min_size=self.gzip_min_size)
+
+    def run(self, interval=0.2):
+        print(f"Watching {self.content_dir}, {self.static_dir} and {self.template_path} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(interval)
+                start = time.perf_counter()
+                rendered, synced = self.poll()
+                if rendered or synced:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    print(f"Rebuilt {rendered} page(s), synced {synced} static file(s) in {elapsed:.1f} ms")
+        except KeyboardInterrupt:
+            print("Stopped watching")